@@ -0,0 +1,45 @@
+"""normalize embeddings and switch HNSW index to inner product
+
+Revision ID: 8c1d4e2f9a7b
+Revises: 316b458235e6
+Create Date: 2026-10-15 10:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op  # type: ignore
+
+revision: str = "8c1d4e2f9a7b"
+down_revision: Union[str, None] = "316b458235e6"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Unit-length rows make <#> rank identically to <=>. l2_normalize()
+    # needs pgvector >= 0.7.
+    op.execute("UPDATE persons SET embedding = l2_normalize(embedding)")
+    op.drop_index("ix_persons_embedding_cosine", table_name="persons")
+    op.create_index(
+        "ix_persons_embedding_ip",
+        "persons",
+        ["embedding"],
+        unique=False,
+        postgresql_using="hnsw",
+        postgresql_with={"m": 16, "ef_construction": 200},
+        postgresql_ops={"embedding": "vector_ip_ops"},
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_persons_embedding_ip", table_name="persons")
+    op.create_index(
+        "ix_persons_embedding_cosine",
+        "persons",
+        ["embedding"],
+        unique=False,
+        postgresql_using="hnsw",
+        postgresql_with={"m": 16, "ef_construction": 64},
+        postgresql_ops={"embedding": "vector_cosine_ops"},
+    )
@@ -0,0 +1,26 @@
+"""index attendance.created_at for newest-first listings
+
+Revision ID: a4c9e2b7f1d3
+Revises: f3a8b1c6d5e2
+Create Date: 2026-10-15 13:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op  # type: ignore
+
+revision: str = "a4c9e2b7f1d3"
+down_revision: Union[str, None] = "f3a8b1c6d5e2"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_attendance_created_at", "attendance", ["created_at"], unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_attendance_created_at", table_name="attendance")
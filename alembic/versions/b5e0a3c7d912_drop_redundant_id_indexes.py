@@ -0,0 +1,27 @@
+"""drop redundant id indexes
+
+Revision ID: b5e0a3c7d912
+Revises: 8c1d4e2f9a7b
+Create Date: 2026-10-15 10:30:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op  # type: ignore
+
+revision: str = "b5e0a3c7d912"
+down_revision: Union[str, None] = "8c1d4e2f9a7b"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # The primary key constraints already provide unique btree indexes.
+    op.drop_index(op.f("ix_attendance_id"), table_name="attendance")
+    op.drop_index(op.f("ix_persons_id"), table_name="persons")
+
+
+def downgrade() -> None:
+    op.create_index(op.f("ix_persons_id"), "persons", ["id"], unique=False)
+    op.create_index(op.f("ix_attendance_id"), "attendance", ["id"], unique=False)
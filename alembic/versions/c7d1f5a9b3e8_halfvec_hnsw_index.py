@@ -0,0 +1,40 @@
+"""halfvec HNSW index on persons.embedding
+
+Revision ID: c7d1f5a9b3e8
+Revises: a4c9e2b7f1d3
+Create Date: 2026-10-15 14:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op  # type: ignore
+
+revision: str = "c7d1f5a9b3e8"
+down_revision: Union[str, None] = "a4c9e2b7f1d3"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Expression index over a half-precision copy; halfvec needs
+    # pgvector >= 0.7 (already required by l2_normalize).
+    op.execute(
+        "CREATE INDEX ix_persons_embedding_half_ip ON persons "
+        "USING hnsw ((embedding::halfvec(512)) halfvec_ip_ops) "
+        "WITH (m = 16, ef_construction = 200)"
+    )
+    op.drop_index("ix_persons_embedding_ip", table_name="persons")
+
+
+def downgrade() -> None:
+    op.create_index(
+        "ix_persons_embedding_ip",
+        "persons",
+        ["embedding"],
+        unique=False,
+        postgresql_using="hnsw",
+        postgresql_with={"m": 16, "ef_construction": 200},
+        postgresql_ops={"embedding": "vector_ip_ops"},
+    )
+    op.drop_index("ix_persons_embedding_half_ip", table_name="persons")
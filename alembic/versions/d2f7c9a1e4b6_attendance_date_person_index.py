@@ -0,0 +1,32 @@
+"""composite (date, person_id) index on attendance
+
+Revision ID: d2f7c9a1e4b6
+Revises: b5e0a3c7d912
+Create Date: 2026-10-15 11:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op  # type: ignore
+
+revision: str = "d2f7c9a1e4b6"
+down_revision: Union[str, None] = "b5e0a3c7d912"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_attendance_date_person",
+        "attendance",
+        ["date", "person_id"],
+        unique=False,
+    )
+    # Covered by the composite index's leading column.
+    op.drop_index(op.f("ix_attendance_date"), table_name="attendance")
+
+
+def downgrade() -> None:
+    op.create_index(op.f("ix_attendance_date"), "attendance", ["date"], unique=False)
+    op.drop_index("ix_attendance_date_person", table_name="attendance")
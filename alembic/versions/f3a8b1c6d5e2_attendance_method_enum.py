@@ -0,0 +1,47 @@
+"""store attendance.method as a native enum
+
+Revision ID: f3a8b1c6d5e2
+Revises: d2f7c9a1e4b6
+Create Date: 2026-10-15 12:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op  # type: ignore
+
+revision: str = "f3a8b1c6d5e2"
+down_revision: Union[str, None] = "d2f7c9a1e4b6"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+attendance_method = sa.Enum("face_bio", "manual_override", name="attendance_method")
+
+
+def upgrade() -> None:
+    attendance_method.create(op.get_bind(), checkfirst=True)
+    # The old text default cannot be cast in place; drop and re-add it.
+    op.alter_column("attendance", "method", server_default=None)
+    op.alter_column(
+        "attendance",
+        "method",
+        type_=attendance_method,
+        postgresql_using="method::attendance_method",
+        existing_nullable=False,
+    )
+    op.alter_column("attendance", "method", server_default="face_bio")
+
+
+def downgrade() -> None:
+    op.alter_column("attendance", "method", server_default=None)
+    op.alter_column(
+        "attendance",
+        "method",
+        type_=sa.String(),
+        postgresql_using="method::text",
+        existing_nullable=False,
+    )
+    op.alter_column("attendance", "method", server_default="face_bio")
+    attendance_method.drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,94 @@
+"""Per-frame numeric helpers for camera_client.py.
+
+Numba is optional. When it is installed the loop kernels are compiled on
+first use (and cached on disk); otherwise the NumPy versions are used.
+"""
+
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+
+def _iou_matrix_numpy(boxes_a: np.ndarray, boxes_b: np.ndarray) -> np.ndarray:
+    a = boxes_a[:, None, :]
+    b = boxes_b[None, :, :]
+    inter_w = np.clip(
+        np.minimum(a[..., 2], b[..., 2]) - np.maximum(a[..., 0], b[..., 0]), 0, None
+    )
+    inter_h = np.clip(
+        np.minimum(a[..., 3], b[..., 3]) - np.maximum(a[..., 1], b[..., 1]), 0, None
+    )
+    inter = inter_w * inter_h
+    area_a = (a[..., 2] - a[..., 0]) * (a[..., 3] - a[..., 1])
+    area_b = (b[..., 2] - b[..., 0]) * (b[..., 3] - b[..., 1])
+    return (inter / np.maximum(area_a + area_b - inter, 1e-6)).astype(np.float32)
+
+
+def _iou_matrix_loops(boxes_a: np.ndarray, boxes_b: np.ndarray) -> np.ndarray:
+    out = np.zeros((boxes_a.shape[0], boxes_b.shape[0]), dtype=np.float32)
+    for i in range(boxes_a.shape[0]):
+        ax1, ay1, ax2, ay2 = boxes_a[i, 0], boxes_a[i, 1], boxes_a[i, 2], boxes_a[i, 3]
+        area_a = (ax2 - ax1) * (ay2 - ay1)
+        for j in range(boxes_b.shape[0]):
+            bx1, by1, bx2, by2 = (
+                boxes_b[j, 0],
+                boxes_b[j, 1],
+                boxes_b[j, 2],
+                boxes_b[j, 3],
+            )
+            inter_w = min(ax2, bx2) - max(ax1, bx1)
+            inter_h = min(ay2, by2) - max(ay1, by1)
+            if inter_w <= 0 or inter_h <= 0:
+                continue
+            inter = inter_w * inter_h
+            union = area_a + (bx2 - bx1) * (by2 - by1) - inter
+            out[i, j] = inter / max(union, 1e-6)
+    return out
+
+
+if njit is not None:
+    _iou_kernel = njit(cache=True, fastmath=True)(_iou_matrix_loops)
+else:
+    _iou_kernel = _iou_matrix_numpy
+
+
+def iou_matrix(boxes_a: np.ndarray, boxes_b: np.ndarray) -> np.ndarray:
+    """Pairwise IoU between two (N, 4) arrays of x1, y1, x2, y2 boxes."""
+    return _iou_kernel(
+        np.ascontiguousarray(boxes_a, dtype=np.float32),
+        np.ascontiguousarray(boxes_b, dtype=np.float32),
+    )
+
+
+# Packed key = row * CELL_KEY_STRIDE + column; far more columns than any
+# camera frame has at a 50px cell size.
+CELL_KEY_STRIDE = 100_000
+
+
+def _cell_keys_loops(boxes: np.ndarray, cell_size: int) -> np.ndarray:
+    out = np.empty(boxes.shape[0], dtype=np.int64)
+    for i in range(boxes.shape[0]):
+        cx = (boxes[i, 0] + boxes[i, 2]) // 2
+        cy = (boxes[i, 1] + boxes[i, 3]) // 2
+        out[i] = (cy // cell_size) * CELL_KEY_STRIDE + cx // cell_size
+    return out
+
+
+def _cell_keys_numpy(boxes: np.ndarray, cell_size: int) -> np.ndarray:
+    centres = ((boxes[:, :2] + boxes[:, 2:]) // 2) // cell_size
+    return centres[:, 1] * CELL_KEY_STRIDE + centres[:, 0]
+
+
+if njit is not None:
+    _cell_keys_kernel = njit(cache=True)(_cell_keys_loops)
+else:
+    _cell_keys_kernel = _cell_keys_numpy
+
+
+def cell_keys(bboxes, cell_size: int = 50) -> list[int]:
+    """Integer grid-cell key of each box centre, for use as a dict key."""
+    boxes = np.ascontiguousarray(np.asarray(bboxes).reshape(-1, 4), dtype=np.int64)
+    return _cell_keys_kernel(boxes, cell_size).tolist()
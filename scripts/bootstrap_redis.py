@@ -0,0 +1,303 @@
+"""Make sure the Redis cache is reachable before the API server starts.
+
+Run once per host, before uvicorn (the Docker image and `start()` do this),
+instead of letting every worker race to spawn Redis during startup. Nothing
+is done when Upstash REST is configured. For a local Redis target that is
+down, the Docker Compose service or an OS-native redis-server is started
+(see AUTO_START_LOCAL_REDIS / LOCAL_REDIS_START_CMD / PREFER_DOCKER_REDIS);
+a remote target is only waited for.
+
+Exits 0 when Redis answers PING, 1 otherwise.
+"""
+
+import asyncio
+import functools
+import os
+import platform
+import shlex
+import shutil
+import subprocess
+import sys
+from urllib.parse import urlparse
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.redis_config import (
+    CACHE_BACKEND,
+    REDIS_HOST,
+    REDIS_PORT,
+    REDIS_URL,
+    UPSTASH_REDIS_REST_TOKEN,
+    UPSTASH_REDIS_REST_URL,
+    redis_available,
+)
+
+AUTO_START_LOCAL_REDIS = os.getenv(
+    "AUTO_START_LOCAL_REDIS", "true"
+).strip().lower() in {"1", "true", "yes", "on"}
+LOCAL_REDIS_START_CMD = os.getenv("LOCAL_REDIS_START_CMD", "").strip()
+LOCAL_REDIS_START_TIMEOUT_SECONDS = float(
+    os.getenv("LOCAL_REDIS_START_TIMEOUT_SECONDS", "12")
+)
+PREFER_DOCKER_REDIS = os.getenv("PREFER_DOCKER_REDIS", "true").strip().lower() in {
+    "1",
+    "true",
+    "yes",
+    "on",
+}
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PLATFORM_SYSTEM = platform.system()
+
+
+def _redis_host_port() -> tuple[str, int]:
+    if REDIS_URL:
+        parsed = urlparse(REDIS_URL)
+        host = parsed.hostname or "localhost"
+        port = parsed.port or 6379
+        return host, port
+    return REDIS_HOST, REDIS_PORT
+
+
+def _is_local_redis_target() -> bool:
+    host, _ = _redis_host_port()
+    return host.strip("[]").lower() in {"localhost", "127.0.0.1", "::1"}
+
+
+def _parse_custom_start_command() -> list[str] | None:
+    if not LOCAL_REDIS_START_CMD:
+        return None
+    return shlex.split(LOCAL_REDIS_START_CMD, posix=os.name != "nt")
+
+
+# Environment probes below are cached: PATH lookups and /proc reads do not
+# change while the process runs. Callers must not mutate the returned lists.
+@functools.lru_cache(maxsize=1)
+def _is_running_in_container() -> bool:
+    if os.path.exists("/.dockerenv"):
+        return True
+
+    cgroup_path = "/proc/1/cgroup"
+    if os.path.exists(cgroup_path):
+        try:
+            with open(cgroup_path, "r", encoding="utf-8") as cgroup_file:
+                cgroup_text = cgroup_file.read().lower()
+            return any(
+                marker in cgroup_text
+                for marker in ("docker", "containerd", "kubepods", "podman")
+            )
+        except OSError:
+            return False
+    return False
+
+
+@functools.lru_cache(maxsize=1)
+def _docker_start_commands() -> list[tuple[list[str], str | None]]:
+    compose_path = os.path.join(PROJECT_ROOT, "docker-compose.yml")
+    if not os.path.exists(compose_path):
+        return []
+
+    # Already in a container: skip docker CLI.
+    if _is_running_in_container():
+        return []
+
+    commands: list[tuple[list[str], str | None]] = []
+    if shutil.which("docker"):
+        commands.append((["docker", "compose", "up", "-d", "redis"], PROJECT_ROOT))
+    if shutil.which("docker-compose"):
+        commands.append((["docker-compose", "up", "-d", "redis"], PROJECT_ROOT))
+    return commands
+
+
+@functools.lru_cache(maxsize=1)
+def _native_start_commands() -> list[tuple[list[str], str | None]]:
+    _, port = _redis_host_port()
+    system_name = PLATFORM_SYSTEM.lower()
+    commands: list[tuple[list[str], str | None]] = []
+
+    def add_redis_server(executable: str) -> None:
+        if shutil.which(executable):
+            commands.append(
+                (
+                    [
+                        executable,
+                        "--port",
+                        str(port),
+                        "--save",
+                        "",
+                        "--appendonly",
+                        "no",
+                    ],
+                    None,
+                )
+            )
+
+    if system_name == "windows":
+        add_redis_server("redis-server.exe")
+        add_redis_server("redis-server")
+        if shutil.which("wsl"):
+            commands.append(
+                (
+                    [
+                        "wsl",
+                        "redis-server",
+                        "--port",
+                        str(port),
+                        "--save",
+                        "",
+                        "--appendonly",
+                        "no",
+                    ],
+                    None,
+                )
+            )
+    elif system_name == "darwin":
+        if shutil.which("brew"):
+            commands.append((["brew", "services", "start", "redis"], None))
+        add_redis_server("redis-server")
+    elif system_name == "linux":
+        if shutil.which("systemctl"):
+            commands.append((["systemctl", "--user", "start", "redis"], None))
+            commands.append((["systemctl", "--user", "start", "redis-server"], None))
+        if shutil.which("service"):
+            commands.append((["service", "redis-server", "start"], None))
+            commands.append((["service", "redis", "start"], None))
+        add_redis_server("redis-server")
+    else:
+        add_redis_server("redis-server")
+
+    return commands
+
+
+@functools.lru_cache(maxsize=1)
+def _default_start_commands() -> list[tuple[list[str], str | None]]:
+    commands: list[tuple[list[str], str | None]] = []
+    docker_commands = _docker_start_commands()
+    native_commands = _native_start_commands()
+
+    if PREFER_DOCKER_REDIS:
+        commands.extend(docker_commands)
+        commands.extend(native_commands)
+    else:
+        commands.extend(native_commands)
+        commands.extend(docker_commands)
+
+    # Keep order, drop dupes.
+    seen: set[tuple[tuple[str, ...], str | None]] = set()
+    deduped: list[tuple[list[str], str | None]] = []
+    for command, cwd in commands:
+        key = (tuple(command), cwd)
+        if key in seen:
+            continue
+        seen.add(key)
+        deduped.append((command, cwd))
+    return deduped
+
+
+def _spawn_detached(command: list[str], cwd: str | None = None) -> None:
+    if os.name == "nt":
+        creationflags = getattr(subprocess, "CREATE_NEW_PROCESS_GROUP", 0) | getattr(
+            subprocess, "DETACHED_PROCESS", 0
+        )
+        subprocess.Popen(
+            command,
+            cwd=cwd,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            creationflags=creationflags,
+        )
+    else:
+        subprocess.Popen(
+            command,
+            cwd=cwd,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            start_new_session=True,
+        )
+
+
+async def _wait_for_redis_ready(timeout_seconds: float) -> bool:
+    timeout = max(timeout_seconds, 1.0)
+    deadline = asyncio.get_running_loop().time() + timeout
+
+    while asyncio.get_running_loop().time() < deadline:
+        if await redis_available():
+            return True
+        await asyncio.sleep(0.5)
+
+    return False
+
+
+async def start_local_redis() -> None:
+    if not AUTO_START_LOCAL_REDIS:
+        raise RuntimeError(
+            "Redis is unavailable and automatic local startup is disabled "
+            "(AUTO_START_LOCAL_REDIS=false)."
+        )
+
+    commands: list[tuple[list[str], str | None]] = []
+    custom_command = _parse_custom_start_command()
+    if custom_command:
+        commands.append((custom_command, PROJECT_ROOT))
+    commands.extend(_default_start_commands())
+
+    print(
+        "Redis auto-start detection: "
+        f"os={PLATFORM_SYSTEM}, "
+        f"inside_container={_is_running_in_container()}, "
+        f"prefer_docker={PREFER_DOCKER_REDIS}"
+    )
+
+    if not commands:
+        raise RuntimeError(
+            "No local Redis startup command found for the detected environment. "
+            "Install redis-server, Docker/Docker Compose, or set "
+            "LOCAL_REDIS_START_CMD in .env."
+        )
+
+    failures: list[str] = []
+    for command, cwd in commands:
+        try:
+            _spawn_detached(command, cwd)
+            if await _wait_for_redis_ready(LOCAL_REDIS_START_TIMEOUT_SECONDS):
+                print(f"Local Redis started: {' '.join(command)}")
+                return
+            failures.append(
+                f"{' '.join(command)} (process launched but Redis not ready)"
+            )
+        except Exception as error:
+            failures.append(f"{' '.join(command)} ({error})")
+
+    joined = "; ".join(failures)
+    raise RuntimeError(f"Failed to auto-start local Redis. Attempts: {joined}")
+
+
+async def bootstrap() -> bool:
+    if CACHE_BACKEND != "redis" and UPSTASH_REDIS_REST_URL and UPSTASH_REDIS_REST_TOKEN:
+        print("Upstash REST configured; nothing to start.")
+        return True
+
+    if await redis_available():
+        print("Redis is already running.")
+        return True
+
+    if not _is_local_redis_target():
+        host, port = _redis_host_port()
+        print(f"Waiting for remote Redis at {host}:{port}...")
+        return await _wait_for_redis_ready(LOCAL_REDIS_START_TIMEOUT_SECONDS)
+
+    try:
+        await start_local_redis()
+    except RuntimeError as error:
+        print(error)
+        return False
+    return True
+
+
+def main() -> int:
+    return 0 if asyncio.run(bootstrap()) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,28 +1,61 @@
 import asyncio
+import base64
+import heapq
 import os
+import queue
 import sys
 import threading
 import time
 import warnings
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 
 import cv2
 import numpy as np
 import requests
 import websockets
 from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
 
 load_dotenv()
 
 SERVER_IP = os.getenv("SERVER_IP", "127.0.0.1")
 SERVER_PORT = os.getenv("SERVER_PORT", "8000")
 CAMERA_INDEX = int(os.getenv("CAMERA_INDEX", 0))
+USE_TENSORRT = os.getenv("USE_TENSORRT", "true").strip().lower() in {
+    "1",
+    "true",
+    "yes",
+    "on",
+}
+TRT_CACHE_DIR = os.getenv("TRT_CACHE_DIR", "./trt_cache")
+# buffalo_s_fp16 / buffalo_s_int8 are produced by scripts/optimize_models.py.
+FACE_MODEL_PACK = os.getenv("FACE_MODEL_PACK", "buffalo_s")
+# Run detection on every Nth captured frame; the overlay reuses the last
+# result in between.
+DETECT_EVERY_N = max(1, int(os.getenv("DETECT_EVERY_N", 3)))
+# Optional CPU list for the AI thread, e.g. "2,3" (Linux only).
+AI_CPU_AFFINITY = os.getenv("AI_CPU_AFFINITY", "")
+# Width of the streamed preview; the local window keeps full resolution.
+PREVIEW_WIDTH = int(os.getenv("PREVIEW_WIDTH", 640))
 
 MIN_BRIGHTNESS = 60
 MIN_FACE_WIDTH = 60
 MIN_DET_SCORE = 0.60
-
-API_URL = f"http://{SERVER_IP}:{SERVER_PORT}/attendance/identify"
+# Mean absolute grey-level change (0-255, on an 80x45 thumbnail) below
+# which a frame counts as unchanged and detection is skipped, but never
+# for longer than MOTION_MAX_AGE seconds.
+MOTION_THRESHOLD = 2.0
+MOTION_MAX_AGE = 0.5
+# Minimum seconds between server verifications of the same grid cell.
+VERIFY_COOLDOWN = 1.0
+# Cosine similarity above which a face reuses a recent server verdict.
+IDENTITY_MATCH_SIM = 0.60
+
+API_URL = f"http://{SERVER_IP}:{SERVER_PORT}/attendance/identify_batch"
 WS_URL = f"ws://{SERVER_IP}:{SERVER_PORT}/ws/video-input"
+# Let the transport buffer ~1 MB of frames before send() waits on drain.
+WS_WRITE_LIMIT = 2**20
 
 cuda_bin = os.getenv("CUDA_PATH_BIN", "")
 
@@ -39,11 +72,20 @@ if cuda_bin and os.path.exists(cuda_bin):
 
 warnings.filterwarnings("ignore")
 import onnxruntime as ort  # noqa: E402
+from _fast import cell_keys, iou_matrix  # noqa: E402
 from insightface.app import FaceAnalysis  # noqa: E402
+from insightface.app.common import Face  # noqa: E402
 
 
 class ThreadedCamera:
-    """Read frames on a background thread."""
+    """Read frames on a background thread into a small ring of buffers.
+
+    read() hands out the newest buffer without copying; that slot is not
+    decoded into again until the caller's next read(). Other threads take
+    a private copy with copy_latest().
+    """
+
+    RING_SIZE = 3
 
     def __init__(self, src=0):
         self.capture = cv2.VideoCapture(src)
@@ -52,7 +94,15 @@ class ThreadedCamera:
         self.capture.set(cv2.CAP_PROP_BUFFERSIZE, 1)
 
         self.lock = threading.Lock()
-        self.ret, self.frame = self.capture.read()
+        self.ret, frame = self.capture.read()
+        self._bufs = []
+        if frame is not None:
+            self._bufs = [frame] + [
+                np.empty_like(frame) for _ in range(self.RING_SIZE - 1)
+            ]
+        self._idx = 0
+        # Slot last handed out by read(); update() never decodes into it.
+        self._held = 0
         self.stopped = False
 
     def start(self):
@@ -61,24 +111,46 @@ class ThreadedCamera:
 
     def update(self):
         while not self.stopped:
-            if not self.capture.isOpened():
+            if not self.capture.isOpened() or not self._bufs:
                 self.stop()
                 break
 
-            ret, frame = self.capture.read()
+            with self.lock:
+                nxt = (self._idx + 1) % len(self._bufs)
+                if nxt == self._held:
+                    nxt = (nxt + 1) % len(self._bufs)
+            # Decode straight into a free ring slot instead of a fresh array.
+            ret, frame = self.capture.read(self._bufs[nxt])
             if ret:
+                self._bufs[nxt] = frame
                 with self.lock:
                     self.ret = ret
-                    self.frame = frame
+                    self._idx = nxt
             else:
                 self.stop()
 
     def read(self):
         with self.lock:
-            if self.frame is not None:
-                return self.ret, self.frame.copy()
+            if self._bufs:
+                self._held = self._idx
+                return self.ret, self._bufs[self._idx]
             return self.ret, None
 
+    def copy_latest(self, dst=None, mirror=False):
+        """Copy the newest frame into dst (reallocated if needed) and return it."""
+        with self.lock:
+            if not self._bufs:
+                return None
+            # update() only decodes into other slots while _idx is current.
+            frame = self._bufs[self._idx]
+            if dst is None or dst.shape != frame.shape:
+                dst = np.empty_like(frame)
+            if mirror:
+                cv2.flip(frame, 1, dst=dst)
+            else:
+                np.copyto(dst, frame)
+            return dst
+
     def stop(self):
         self.stopped = True
         self.capture.release()
@@ -87,11 +159,27 @@ class ThreadedCamera:
 class AsyncWebSocketClient:
     def __init__(self, uri: str):
         self.uri = uri
-        self.loop = asyncio.new_event_loop()
-        self.queue: asyncio.Queue[bytes] = asyncio.Queue(maxsize=1)
+        self.loop = self._new_event_loop()
+        # Latest-wins buffer: maxlen=1 drops a frame that has not been sent
+        # yet when a newer one arrives.
+        self._buf: deque[bytes] = deque(maxlen=1)
+        self._wake: asyncio.Future | None = None
+        self.connected = False
         self.thread = threading.Thread(target=self._start_loop, daemon=True)
         self.thread.start()
 
+    @staticmethod
+    def _new_event_loop() -> asyncio.AbstractEventLoop:
+        # uvloop is optional and has no Windows build.
+        if sys.platform != "win32":
+            try:
+                import uvloop
+
+                return uvloop.new_event_loop()
+            except ImportError:
+                pass
+        return asyncio.new_event_loop()
+
     def _start_loop(self) -> None:
         asyncio.set_event_loop(self.loop)
         self.loop.run_until_complete(self._main_loop())
@@ -99,39 +187,101 @@ class AsyncWebSocketClient:
     async def _main_loop(self) -> None:
         while True:
             try:
-                async with websockets.connect(self.uri) as websocket:
+                # JPEG payloads do not deflate; skip permessage-deflate.
+                async with websockets.connect(
+                    self.uri,
+                    compression=None,
+                    max_size=None,
+                    write_limit=WS_WRITE_LIMIT,
+                    max_queue=None,
+                ) as websocket:
                     print("Connected to Stream Relay")
+                    self.connected = True
                     while True:
-                        frame_bytes = await self.queue.get()
-                        await websocket.send(frame_bytes)
+                        # A wake-up scheduled during the previous send can
+                        # arrive after that frame was already taken, so
+                        # re-check the buffer after every wake-up.
+                        while not self._buf:
+                            self._wake = self.loop.create_future()
+                            await self._wake
+                        await websocket.send(self._buf.popleft())
             except Exception:
+                self.connected = False
                 await asyncio.sleep(2)
 
+    def wants_frame(self) -> bool:
+        """True when connected and the previous frame has been picked up."""
+        return self.connected and not self._buf
+
+    def _wake_sender(self) -> None:
+        if self._wake is not None and not self._wake.done():
+            self._wake.set_result(None)
+
     def send_frame(self, frame_bytes: bytes) -> None:
         if self.loop.is_running():
-            if self.queue.full():
-                try:
-                    self.queue.get_nowait()
-                except Exception:
-                    pass
-            self.loop.call_soon_threadsafe(self.queue.put_nowait, frame_bytes)
+            self._buf.append(frame_bytes)
+            self.loop.call_soon_threadsafe(self._wake_sender)
 
 
 print("[-] Loading AI Models...")
 
-provider_list = ["CPUExecutionProvider"]
+provider_list: list = ["CPUExecutionProvider"]
 ctx_id = -1
 det_size = (320, 320)
 mode_name = "CPU OPTIMIZED"
+cuda_stream = None
+
+
+def _create_shared_cuda_stream():
+    """One non-blocking stream for all sessions, if CuPy is installed."""
+    try:
+        import cupy
+
+        return cupy.cuda.Stream(non_blocking=True)
+    except Exception:
+        return None
+
 
 try:
     available_providers = ort.get_available_providers()
     if "CUDAExecutionProvider" in available_providers:
         print("    CUDA Detected! Attempting to initialize GPU mode...")
-        provider_list = ["CUDAExecutionProvider", "CPUExecutionProvider"]
+        cuda_options: dict = {
+            "cudnn_conv_algo_search": "HEURISTIC",
+            "do_copy_in_default_stream": True,
+        }
+        # Detection and recognition run back to back on the AI thread; a
+        # shared user stream keeps them off the legacy default stream.
+        cuda_stream = _create_shared_cuda_stream()
+        if cuda_stream is not None:
+            cuda_options["user_compute_stream"] = str(cuda_stream.ptr)
+        provider_list = [
+            ("CUDAExecutionProvider", cuda_options),
+            "CPUExecutionProvider",
+        ]
         ctx_id = 0
         det_size = (640, 640)
         mode_name = "GPU PURE PRECISION"
+
+        if USE_TENSORRT and "TensorrtExecutionProvider" in available_providers:
+            # FP16 engines are built once and cached on disk; later runs load them.
+            # The timing cache also survives engine rebuilds (new TensorRT or
+            # driver version), so tactic selection is not repeated from scratch.
+            os.makedirs(TRT_CACHE_DIR, exist_ok=True)
+            provider_list.insert(
+                0,
+                (
+                    "TensorrtExecutionProvider",
+                    {
+                        "trt_fp16_enable": True,
+                        "trt_engine_cache_enable": True,
+                        "trt_engine_cache_path": TRT_CACHE_DIR,
+                        "trt_timing_cache_enable": True,
+                        "trt_timing_cache_path": TRT_CACHE_DIR,
+                    },
+                ),
+            )
+            mode_name = "GPU TENSORRT FP16"
     else:
         print("    CUDA Not Found. Using Multi-threaded CPU mode.")
 
@@ -140,115 +290,491 @@ except Exception as e:
 
 print(f"[-] Mode: {mode_name} | Resolution: {det_size}")
 
-app = FaceAnalysis(name="buffalo_s", providers=provider_list)
+# Only load what the loop uses: landmark and gender/age models would
+# otherwise run on every face of every frame inside app.get().
+app = FaceAnalysis(
+    name=FACE_MODEL_PACK,
+    allowed_modules=["detection", "recognition"],
+    providers=provider_list,
+)
 app.prepare(ctx_id=ctx_id, det_size=det_size)
+
+
+def _cpu_session_options() -> ort.SessionOptions:
+    # ORT defaults to one intra-op thread per logical core, which
+    # oversubscribes SMT machines; stay near the physical core count.
+    so = ort.SessionOptions()
+    so.intra_op_num_threads = max(1, (os.cpu_count() or 2) // 2)
+    so.inter_op_num_threads = 1
+    so.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+    so.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+    return so
+
+
+if ctx_id < 0:
+    # InsightFace does not forward session options, so rebuild the CPU
+    # sessions from the same model files.
+    cpu_options = _cpu_session_options()
+    for model in app.models.values():
+        model.session = ort.InferenceSession(
+            model.model_file,
+            sess_options=cpu_options,
+            providers=["CPUExecutionProvider"],
+        )
+
+rec_model = app.models["recognition"]
+
+
+# Cheap first detection pass used when the main detector runs larger.
+COARSE_DET_SIZE = (320, 320)
+# Coarse detections this confident and this wide skip the full-size pass.
+COARSE_CONFIDENT_SCORE = 0.70
+COARSE_CONFIDENT_WIDTH = MIN_FACE_WIDTH * 1.5
+
+
+def _detect(img, input_size=None) -> tuple[np.ndarray, np.ndarray | None]:
+    return app.det_model.detect(img, input_size=input_size, max_num=0, metric="default")
+
+
+def detect_faces(img) -> tuple[list, np.ndarray]:
+    """Run the detector alone; embeddings are computed on demand.
+
+    When det_size is larger than COARSE_DET_SIZE, a coarse pass runs
+    first. Frames with no face, or only clear, large faces, stop there;
+    anything borderline is re-detected at full size. Weak and undersized
+    detections are dropped in one vectorised pass. Returns the kept faces
+    and their (N, 4) boxes.
+    """
+    if det_size[0] > COARSE_DET_SIZE[0]:
+        bboxes, kpss = _detect(img, COARSE_DET_SIZE)
+        widths = bboxes[:, 2] - bboxes[:, 0]
+        confident = (bboxes[:, 4] >= COARSE_CONFIDENT_SCORE) & (
+            widths >= COARSE_CONFIDENT_WIDTH
+        )
+        if len(bboxes) and not confident.all():
+            bboxes, kpss = _detect(img)
+    else:
+        bboxes, kpss = _detect(img)
+
+    widths = bboxes[:, 2] - bboxes[:, 0]
+    keep = np.flatnonzero((bboxes[:, 4] >= MIN_DET_SCORE) & (widths >= MIN_FACE_WIDTH))
+    faces = [
+        Face(
+            bbox=bboxes[i, 0:4],
+            kps=kpss[i] if kpss is not None else None,
+            det_score=bboxes[i, 4],
+        )
+        for i in keep
+    ]
+    return faces, bboxes[keep, 0:4]
+
+
+def warmup_models(rounds: int = 3) -> None:
+    """Run a few dummy passes so kernel selection happens before the first frame."""
+    blank = np.zeros((det_size[1], det_size[0], 3), dtype=np.uint8)
+    face_crop = np.zeros((112, 112, 3), dtype=np.uint8)
+    for _ in range(rounds):
+        # A blank frame stops at the coarse pass, so warm both sizes.
+        _detect(blank, COARSE_DET_SIZE)
+        _detect(blank)
+        rec_model.get_feat(face_crop)
+
+
+warmup_models()
 print(" AI Ready.")
 
 ws_client = AsyncWebSocketClient(WS_URL)
 
-latest_frame = None
+# Keep-alive pool shared by verification calls instead of a new TCP
+# connection per face.
+api_session = requests.Session()
+api_session.headers.update({"X-API-Key": os.getenv("API_KEY", "")})
+api_session.mount("http://", HTTPAdapter(pool_connections=4, pool_maxsize=16))
+api_session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=16))
+verify_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="verify")
+# Caps queued + running verifications so a burst of faces cannot pile up.
+verify_slots = threading.BoundedSemaphore(8)
+
+latest_brightness = 0.0
+frame_seq = 0
 detected_faces: list = []
-recognition_results: dict = {}
+# Keyed by the packed cell of the face centre on a 50px grid (see cell_keys).
+recognition_results: dict[int, dict] = {}
+# (expiry, face_key) min-heap used to evict stale recognition_results.
+expiry_heap: list[tuple[float, int]] = []
+# (unit embedding, result) pairs for recently verified faces.
+recent_identities: list = []
 results_lock = threading.Lock()
-state_lock = threading.Lock()
-last_api_call = 0
+encode_queue: queue.Queue = queue.Queue(maxsize=1)
+# Overlay frames recycled between the UI and encoder threads.
+vis_pool: queue.SimpleQueue = queue.SimpleQueue()
 running = True
 
 
-def get_brightness(frame):
-    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-    return np.mean(gray)
-
-
-def verify_face_worker(embedding_list, face_key):
-    global recognition_results
+# BT.601 weights in BGR order, matching cv2.COLOR_BGR2GRAY.
+LUMA_WEIGHTS = np.array([0.114, 0.587, 0.299], dtype=np.float32)
+
+
+def get_brightness(frame) -> float:
+    # A 16px-strided view is plenty for a darkness gate and avoids
+    # converting (and allocating) the whole frame. Weighting the channel
+    # means keeps it on the same scale as the old grayscale mean.
+    sample = frame[::16, ::16]
+    return float(sample.reshape(-1, 3).mean(axis=0) @ LUMA_WEIGHTS)
+
+
+class IoUTracker:
+    """Follow faces across frames by bounding-box overlap.
+
+    Each track keeps the last server verdict for the face, so an already
+    identified person is not re-verified while they stay in view.
+    """
+
+    def __init__(self, iou_threshold: float = 0.3, max_age: float = 1.0):
+        self.iou_threshold = iou_threshold
+        self.max_age = max_age
+        self.tracks: dict[int, dict] = {}
+        self._next_id = 0
+
+    def update(self, bboxes: np.ndarray, now: float) -> list[int]:
+        """Return a track id per bbox, opening tracks for unmatched boxes."""
+        track_ids = list(self.tracks)
+        assigned = [-1] * len(bboxes)
+
+        if track_ids and len(bboxes):
+            previous = np.array([self.tracks[tid]["bbox"] for tid in track_ids])
+            ious = iou_matrix(bboxes, previous)
+            taken: set[int] = set()
+            # Greedy best-overlap-first matching; optimal for the handful of
+            # faces a single camera sees.
+            for flat in np.argsort(ious, axis=None)[::-1]:
+                row, col = divmod(int(flat), len(track_ids))
+                if ious[row, col] < self.iou_threshold:
+                    break
+                if assigned[row] != -1 or col in taken:
+                    continue
+                assigned[row] = track_ids[col]
+                taken.add(col)
+
+        for row, bbox in enumerate(bboxes):
+            if assigned[row] == -1:
+                assigned[row] = self._next_id
+                self.tracks[self._next_id] = {"result": None}
+                self._next_id += 1
+            track = self.tracks[assigned[row]]
+            track["bbox"] = bbox
+            track["last_seen"] = now
+
+        self.tracks = {
+            tid: track
+            for tid, track in self.tracks.items()
+            if now - track["last_seen"] <= self.max_age
+        }
+        return assigned
+
+
+def _unit(vector) -> np.ndarray:
+    vector = np.asarray(vector, dtype=np.float32)
+    return vector / (np.linalg.norm(vector) + 1e-12)
+
+
+def store_result(face_key: int, result: dict) -> None:
+    """Publish a verdict for a grid cell. Needs results_lock."""
+    recognition_results[face_key] = result
+    heapq.heappush(expiry_heap, (result["expiry"], face_key))
+
+
+def sweep_expired_results(now: float) -> None:
+    """Drop verdicts whose expiry has passed. Needs results_lock."""
+    while expiry_heap and expiry_heap[0][0] < now:
+        _, face_key = heapq.heappop(expiry_heap)
+        result = recognition_results.get(face_key)
+        # The cell may have been re-published with a later expiry since.
+        if result is not None and result["expiry"] < now:
+            del recognition_results[face_key]
+
+
+def lookup_recent_identity(embedding, now: float):
+    """Return a cached verdict for a face seen moments ago. Needs results_lock."""
+    recent_identities[:] = [
+        item for item in recent_identities if item[1]["expiry"] > now
+    ]
+    if not recent_identities:
+        return None
+
+    sims = np.stack([item[0] for item in recent_identities]) @ _unit(embedding)
+    best = int(np.argmax(sims))
+    if sims[best] > IDENTITY_MATCH_SIM:
+        return recent_identities[best][1]
+    return None
+
+
+def _pack_f16(embedding) -> str:
+    packed = np.asarray(embedding, dtype="<f2").tobytes()
+    return base64.b64encode(packed).decode("ascii")
+
+
+def verify_faces_worker(embeddings: list, face_keys: list) -> None:
+    """Verify all faces from one tick in a single request."""
     try:
-        headers = {"X-API-Key": os.getenv("API_KEY", "")}
-        payload = {"embedding": embedding_list, "camera_id": "Pro_Cam_01"}
+        payload = {
+            "embeddings_b64": [_pack_f16(embedding) for embedding in embeddings],
+            "dtype": "f16",
+            "camera_id": "Pro_Cam_01",
+        }
 
-        response = requests.post(API_URL, json=payload, headers=headers, timeout=5)
+        response = api_session.post(API_URL, json=payload, timeout=5)
 
         if response.status_code == 200:
-            data = response.json()
-            name = data.get("person_name", "Unknown")
-            status = data.get("status")
-            color = (0, 255, 0) if status in ["success", "ignored"] else (0, 0, 255)
-
+            expiry = time.time() + 5.0
+            verdicts = response.json().get("results", [])
             with results_lock:
-                recognition_results[face_key] = {
-                    "name": name,
-                    "color": color,
-                    "expiry": time.time() + 5.0,
-                }
+                for embedding, face_key, data in zip(embeddings, face_keys, verdicts):
+                    name = data.get("person_name", "Unknown")
+                    status = data.get("status")
+                    known = status in ["success", "ignored"]
+                    color = (0, 255, 0) if known else (0, 0, 255)
+
+                    result = {
+                        "name": name,
+                        "color": color,
+                        "known": known,
+                        "expiry": expiry,
+                    }
+                    store_result(face_key, result)
+                    recent_identities.append((_unit(embedding), result))
     except Exception:
         pass
 
 
-def ai_worker():
-    global detected_faces, last_api_call
-    while running:
-        with state_lock:
-            if latest_frame is None:
-                img_copy = None
-            else:
-                img_copy = latest_frame.copy()
+def submit_verification(embeddings: list, face_keys: list) -> bool:
+    """Queue a batch verification unless too many are already in flight."""
+    if not verify_slots.acquire(blocking=False):
+        return False
+    future = verify_executor.submit(verify_faces_worker, embeddings, face_keys)
+    future.add_done_callback(lambda _: verify_slots.release())
+    return True
 
-        if img_copy is None:
-            time.sleep(0.01)
+
+def pin_current_thread(cpu_list: str) -> None:
+    """Restrict the calling thread to the given CPUs, where supported."""
+    if not cpu_list or not hasattr(os, "sched_setaffinity"):
+        return
+    try:
+        cpus = {int(cpu) for cpu in cpu_list.split(",") if cpu.strip()}
+        # pid 0 targets the calling thread on Linux.
+        os.sched_setaffinity(0, cpus)
+        print(f"[-] AI thread pinned to CPUs {sorted(cpus)}")
+    except (ValueError, OSError) as e:
+        print(f"    Could not pin AI thread: {e}")
+
+
+def ai_worker(cam: ThreadedCamera):
+    global detected_faces
+    pin_current_thread(AI_CPU_AFFINITY)
+    tracker = IoUTracker()
+    last_seq = -DETECT_EVERY_N
+    img_copy = None
+    prev_thumb = None
+    last_inference = 0.0
+    last_sweep = 0.0
+    # face_key -> earliest time that cell may be sent to the server again.
+    next_verify_at: dict[int, float] = {}
+    while running:
+        seq = frame_seq
+        brightness = latest_brightness
+        if seq - last_seq < DETECT_EVERY_N:
+            time.sleep(0.005)
             continue
+        last_seq = seq
 
-        brightness = get_brightness(img_copy)
         if brightness < MIN_BRIGHTNESS:
-            with state_lock:
-                detected_faces = []
+            detected_faces = []
             time.sleep(0.1)
             continue
 
-        img_rgb = cv2.cvtColor(img_copy, cv2.COLOR_BGR2RGB)
-        faces = app.get(img_rgb)
-        current_time = time.time()
-
-        valid_faces = []
+        # The ring reuses its buffers, so work on a copy owned by this
+        # thread; copy_latest() takes it under the camera lock. Enrolment
+        # embeds mirrored frames, so recognition sees the mirrored image
+        # too; the flip writes the copy, so it costs no extra pass.
+        img_copy = cam.copy_latest(img_copy, mirror=True)
+        if img_copy is None:
+            time.sleep(0.005)
+            continue
 
-        for face in faces:
-            bbox = face.bbox.astype(int)
-            width = bbox[2] - bbox[0]
+        # Motion gate: an unchanged scene keeps the last detections.
+        thumb = cv2.cvtColor(
+            cv2.resize(img_copy, (80, 45), interpolation=cv2.INTER_AREA),
+            cv2.COLOR_BGR2GRAY,
+        )
+        now = time.time()
+        if (
+            prev_thumb is not None
+            and now - last_inference < MOTION_MAX_AGE
+            and cv2.absdiff(thumb, prev_thumb).mean() < MOTION_THRESHOLD
+        ):
+            continue
+        prev_thumb = thumb
+        last_inference = now
 
-            if face.det_score < MIN_DET_SCORE:
-                continue
-            if width < MIN_FACE_WIDTH:
-                continue
+        # InsightFace models take BGR and swap channels in blobFromImage.
+        valid_faces, boxes = detect_faces(img_copy)
+        current_time = time.time()
 
-            valid_faces.append(face)
+        track_ids = tracker.update(boxes, current_time)
+        face_keys = cell_keys(boxes)
 
-            center_x = (bbox[0] + bbox[2]) // 2
-            center_y = (bbox[1] + bbox[3]) // 2
-            face_key = f"{center_x // 50}_{center_y // 50}"
+        pending = []
+        for face, track_id, face_key in zip(valid_faces, track_ids, face_keys):
+            track = tracker.tracks[track_id]
 
             with results_lock:
-                if (
-                    face_key not in recognition_results
-                    or current_time > recognition_results[face_key]["expiry"]
+                # An identified track keeps its verdict while the face stays
+                # in view and carries it to whatever grid cell it moves to.
+                # Unknown verdicts still expire so the face is retried.
+                result = track["result"]
+                if result is not None and (
+                    result["known"] or current_time <= result["expiry"]
                 ):
-                    if (current_time - last_api_call) > 1.0:
-                        last_api_call = current_time
-                        threading.Thread(
-                            target=verify_face_worker,
-                            args=(face.embedding.tolist(), face_key),
-                            daemon=True,
-                        ).start()
+                    result = {
+                        **result,
+                        "expiry": max(result["expiry"], current_time + 1.0),
+                    }
+                    track["result"] = result
+                    store_result(face_key, result)
+                    continue
+
+                cached = recognition_results.get(face_key)
+                if cached is not None and current_time <= cached["expiry"]:
+                    track["result"] = cached
+                    continue
+
+            pending.append((face, face_key, track))
+
+        # Only faces without a verdict pay for the recognition model, and
+        # whatever is still unknown goes to the server as one batch.
+        unknown_embeddings, unknown_keys = [], []
+        for face, face_key, track in pending:
+            embedding = rec_model.get(img_copy, face)
+            with results_lock:
+                known = lookup_recent_identity(embedding, current_time)
+                if known is not None:
+                    store_result(face_key, known)
+                    track["result"] = known
+                    continue
+            # Cooldown is per cell, so a second face is not held back by
+            # the first one's request.
+            if current_time >= next_verify_at.get(face_key, 0.0):
+                unknown_embeddings.append(embedding)
+                unknown_keys.append(face_key)
+
+        if unknown_embeddings and submit_verification(unknown_embeddings, unknown_keys):
+            for face_key in unknown_keys:
+                next_verify_at[face_key] = current_time + VERIFY_COOLDOWN
+
+        if current_time - last_sweep > 1.0:
+            with results_lock:
+                sweep_expired_results(current_time)
+            next_verify_at = {
+                key: t for key, t in next_verify_at.items() if t > current_time
+            }
+            last_sweep = current_time
 
-        with state_lock:
-            detected_faces = valid_faces
+        detected_faces = valid_faces
+
+
+try:
+    # libjpeg-turbo with the fast integer DCT; optional, and noticeably
+    # quicker than cv2.imencode at the same quality.
+    import simplejpeg
+except ImportError:
+    simplejpeg = None
+
+JPEG_QUALITY = 80
+JPEG_PARAMS = [
+    cv2.IMWRITE_JPEG_QUALITY,
+    JPEG_QUALITY,
+    cv2.IMWRITE_JPEG_OPTIMIZE,
+    0,
+    cv2.IMWRITE_JPEG_PROGRESSIVE,
+    0,
+    cv2.IMWRITE_JPEG_RST_INTERVAL,
+    0,
+]
+
+
+def encode_jpeg(frame) -> bytes | None:
+    """Encode a BGR frame as baseline JPEG for the preview stream."""
+    if simplejpeg is not None:
+        return simplejpeg.encode_jpeg(
+            frame, quality=JPEG_QUALITY, colorspace="BGR", fastdct=True
+        )
+    ok, buffer = cv2.imencode(".jpg", frame, JPEG_PARAMS)
+    return buffer.tobytes() if ok else None
+
+
+def take_vis_buffer(frame) -> np.ndarray:
+    """Return a free overlay buffer shaped like frame, reusing old ones."""
+    try:
+        buf = vis_pool.get_nowait()
+        if buf.shape == frame.shape:
+            return buf
+    except queue.Empty:
+        pass
+    return np.empty_like(frame)
+
+
+def encoder_worker():
+    """Encode preview frames off the UI thread and hand them to the relay."""
+    preview = None
+    while running:
+        frame = encode_queue.get()
+        height, width = frame.shape[:2]
+        if 0 < PREVIEW_WIDTH < width:
+            size = (PREVIEW_WIDTH, height * PREVIEW_WIDTH // width)
+            preview = cv2.resize(frame, size, dst=preview, interpolation=cv2.INTER_AREA)
+            # The overlay buffer is free as soon as it has been downscaled.
+            vis_pool.put(frame)
+            jpeg = encode_jpeg(preview)
+        else:
+            jpeg = encode_jpeg(frame)
+            vis_pool.put(frame)
+        if jpeg is not None:
+            ws_client.send_frame(jpeg)
+
+
+def submit_preview(frame) -> None:
+    """Queue a frame for streaming, replacing any frame still waiting.
+
+    Takes ownership of frame: it goes back to vis_pool once it has been
+    encoded or dropped.
+    """
+    # Nobody is watching, or the relay has not taken the last frame yet:
+    # encoding another one would only be thrown away.
+    if not ws_client.wants_frame():
+        vis_pool.put(frame)
+        return
+    try:
+        encode_queue.put_nowait(frame)
+    except queue.Full:
+        try:
+            vis_pool.put(encode_queue.get_nowait())
+        except queue.Empty:
+            pass
+        try:
+            encode_queue.put_nowait(frame)
+        except queue.Full:
+            vis_pool.put(frame)
 
 
 def start_camera():
-    global latest_frame, running
+    global latest_brightness, frame_seq, running
 
     print("[-] Starting Threaded Camera...")
     cam = ThreadedCamera(CAMERA_INDEX).start()
 
-    threading.Thread(target=ai_worker, daemon=True).start()
+    threading.Thread(target=ai_worker, args=(cam,), daemon=True).start()
+    threading.Thread(target=encoder_worker, daemon=True).start()
 
     print("[-] System Online. Press 'q' to exit.")
 
@@ -259,15 +785,17 @@ def start_camera():
             time.sleep(0.01)
             continue
 
-        frame = cv2.flip(frame, 1)
+        # `frame` is this thread's ring slot until the next cam.read(). The
+        # AI thread takes its own mirrored copy, so detected boxes are in
+        # preview coordinates. Single reference assignments are atomic.
+        brightness = get_brightness(frame)
+        latest_brightness = brightness
+        frame_seq += 1
+        faces_to_draw = detected_faces
 
-        with state_lock:
-            latest_frame = frame
-            faces_to_draw = list(detected_faces)
+        # Mirror into a recycled buffer rather than a fresh 2.6 MB array.
+        vis_frame = cv2.flip(frame, 1, dst=take_vis_buffer(frame))
 
-        vis_frame = frame.copy()
-
-        brightness = get_brightness(vis_frame)
         if brightness < MIN_BRIGHTNESS:
             cv2.putText(
                 vis_frame,
@@ -279,11 +807,9 @@ def start_camera():
                 3,
             )
 
-        for face in faces_to_draw:
+        face_keys = cell_keys([face.bbox for face in faces_to_draw])
+        for face, face_key in zip(faces_to_draw, face_keys):
             bbox = face.bbox.astype(int)
-            center_x = (bbox[0] + bbox[2]) // 2
-            center_y = (bbox[1] + bbox[3]) // 2
-            face_key = f"{center_x // 50}_{center_y // 50}"
 
             name, color = "Scanning...", (0, 255, 255)
 
@@ -304,16 +830,18 @@ def start_camera():
                 2,
             )
 
-        _, buffer = cv2.imencode(".jpg", vis_frame, [cv2.IMWRITE_JPEG_QUALITY, 80])
-        ws_client.send_frame(buffer.tobytes())
-
         cv2.imshow("Face Attendance Client (V2 Multi-Threaded)", vis_frame)
+        submit_preview(vis_frame)
+
         if cv2.waitKey(1) & 0xFF == ord("q"):
             running = False
             cam.stop()
             break
 
     cv2.destroyAllWindows()
+    # Drop verifications that have not started; let in-flight ones finish.
+    verify_executor.shutdown(wait=True, cancel_futures=True)
+    api_session.close()
 
 
 if __name__ == "__main__":
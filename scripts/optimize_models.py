@@ -0,0 +1,177 @@
+"""Build a reduced-precision copy of the InsightFace model pack.
+
+The converted pack is written next to the original (e.g. buffalo_s_fp16)
+with the same file names, so camera_client.py can load it through
+FACE_MODEL_PACK. Conversion is refused if recognition embeddings drift
+from the FP32 originals by more than the allowed cosine distance.
+
+fp16 converts every model and suits the CUDA provider. int8 applies
+dynamic quantization to the recognition model only (the detector is
+copied as is) and targets the CPU provider.
+
+Requires: pip install onnx onnxconverter-common (fp16 only)
+"""
+
+import argparse
+import glob
+import os
+import shutil
+import sys
+
+import numpy as np
+import onnxruntime as ort
+
+DEFAULT_ROOT = os.path.join(os.path.expanduser("~"), ".insightface", "models")
+REC_INPUT_SIZE = 112
+# Default accuracy budget per precision.
+MAX_COS_DIST = {"fp16": 1e-3, "int8": 2e-2}
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Convert an InsightFace model pack to FP16/INT8 and verify it."
+    )
+    parser.add_argument("--pack", default="buffalo_s", help="Model pack name.")
+    parser.add_argument(
+        "--precision",
+        choices=sorted(MAX_COS_DIST),
+        default="fp16",
+        help="fp16 for CUDA, int8 for the CPU provider.",
+    )
+    parser.add_argument("--root", default=DEFAULT_ROOT, help="InsightFace models dir.")
+    parser.add_argument(
+        "--samples", type=int, default=64, help="Validation crops to compare."
+    )
+    parser.add_argument(
+        "--images",
+        default=None,
+        help="Optional folder of aligned 112x112 face crops for validation.",
+    )
+    parser.add_argument(
+        "--max-cos-dist",
+        type=float,
+        default=None,
+        help="Largest accepted 1 - cosine(fp32, converted) per embedding "
+        "(default: 1e-3 for fp16, 2e-2 for int8).",
+    )
+    return parser.parse_args()
+
+
+def convert_fp16(src: str, dst: str) -> None:
+    import onnx
+    from onnxconverter_common import float16
+
+    model = onnx.load(src)
+    # Keep float32 inputs/outputs: InsightFace feeds float32 blobs.
+    model = float16.convert_float_to_float16(model, keep_io_types=True)
+    onnx.save(model, dst)
+
+
+def quantize_int8(src: str, dst: str) -> None:
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    # MLAS runs uint8 weights on the VNNI/AVX2 int8 dot-product paths.
+    quantize_dynamic(src, dst, weight_type=QuantType.QUInt8)
+
+
+def load_validation_crops(images_dir: str | None, samples: int) -> np.ndarray:
+    """Return an (N, 3, 112, 112) float32 batch normalised like ArcFaceONNX."""
+    crops = []
+    if images_dir:
+        import cv2
+
+        for path in sorted(glob.glob(os.path.join(images_dir, "*")))[:samples]:
+            img = cv2.imread(path)
+            if img is None:
+                continue
+            crops.append(cv2.resize(img, (REC_INPUT_SIZE, REC_INPUT_SIZE)))
+    if not crops:
+        rng = np.random.default_rng(0)
+        crops = list(
+            rng.integers(
+                0, 256, (samples, REC_INPUT_SIZE, REC_INPUT_SIZE, 3), dtype=np.uint8
+            )
+        )
+
+    batch = np.stack(crops).astype(np.float32)[..., ::-1]
+    batch = (batch - 127.5) / 127.5
+    return np.ascontiguousarray(batch.transpose(0, 3, 1, 2))
+
+
+def embed(model_path: str, batch: np.ndarray) -> np.ndarray:
+    session = ort.InferenceSession(model_path, providers=["CPUExecutionProvider"])
+    name = session.get_inputs()[0].name
+    # Run one crop at a time; some exports have a fixed batch dimension.
+    feats = np.concatenate(
+        [session.run(None, {name: batch[i : i + 1]})[0] for i in range(len(batch))]
+    )
+    return feats / np.linalg.norm(feats, axis=1, keepdims=True)
+
+
+def find_recognition_model(pack_dir: str) -> str | None:
+    for path in sorted(glob.glob(os.path.join(pack_dir, "*.onnx"))):
+        session = ort.InferenceSession(path, providers=["CPUExecutionProvider"])
+        shape = session.get_inputs()[0].shape
+        if shape[2] == REC_INPUT_SIZE and shape[3] == REC_INPUT_SIZE:
+            return os.path.basename(path)
+    return None
+
+
+def main() -> int:
+    args = parse_args()
+    src_dir = os.path.join(args.root, args.pack)
+    dst_dir = os.path.join(args.root, f"{args.pack}_{args.precision}")
+    max_cos_dist = args.max_cos_dist
+    if max_cos_dist is None:
+        max_cos_dist = MAX_COS_DIST[args.precision]
+
+    if not os.path.isdir(src_dir):
+        print(f"Model pack not found: {src_dir}")
+        print("Run camera_client.py once so InsightFace downloads it.")
+        return 1
+
+    rec_name = find_recognition_model(src_dir)
+    if rec_name is None:
+        print(f"No recognition model found in {src_dir}")
+        return 1
+
+    os.makedirs(dst_dir, exist_ok=True)
+    for src in sorted(glob.glob(os.path.join(src_dir, "*.onnx"))):
+        dst = os.path.join(dst_dir, os.path.basename(src))
+        if args.precision == "fp16":
+            print(f"[-] Converting {os.path.basename(src)}")
+            convert_fp16(src, dst)
+        elif os.path.basename(src) == rec_name:
+            print(f"[-] Quantizing {os.path.basename(src)}")
+            quantize_int8(src, dst)
+        else:
+            shutil.copyfile(src, dst)
+
+    batch = load_validation_crops(args.images, args.samples)
+    ref = embed(os.path.join(src_dir, rec_name), batch)
+    converted = embed(os.path.join(dst_dir, rec_name), batch)
+    cos_dist = 1.0 - np.sum(ref * converted, axis=1)
+    worst = float(cos_dist.max())
+    print(
+        f"[-] {rec_name}: mean cos dist {float(cos_dist.mean()):.2e}, "
+        f"max {worst:.2e} over {len(batch)} crops"
+    )
+
+    if worst > max_cos_dist:
+        print(
+            f"{args.precision.upper()} embeddings drift past "
+            f"{max_cos_dist:.0e}; discarding."
+        )
+        shutil.rmtree(dst_dir, ignore_errors=True)
+        return 1
+
+    print(f"Saved to {dst_dir}")
+    print(
+        f"Set FACE_MODEL_PACK={args.pack}_{args.precision} "
+        "to use it in camera_client.py"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
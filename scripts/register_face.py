@@ -9,6 +9,8 @@ from insightface.app import FaceAnalysis
 SERVER_IP = os.getenv("SERVER_IP", "127.0.0.1")
 SERVER_PORT = os.getenv("SERVER_PORT", "8000")
 REG_URL = f"http://{SERVER_IP}:{SERVER_PORT}/persons/register"
+# The preview box only needs refreshing every few frames.
+DETECT_EVERY = 3
 
 default_cuda_path = r"C:\Program Files\NVIDIA GPU Computing Toolkit\CUDA\v12.8\bin"
 cuda_bin = os.getenv("CUDA_PATH_BIN", default_cuda_path)
@@ -71,6 +73,9 @@ def enroll(name_override: str | None = None, employee_id_override: str | None =
     print("  's' -> Save Snapshot & Register")
     print("  'q' -> Quit")
 
+    frame_idx = 0
+    faces: list = []
+
     while True:
         ret, frame = cap.read()
         if not ret:
@@ -79,7 +84,9 @@ def enroll(name_override: str | None = None, employee_id_override: str | None =
         frame = cv2.flip(frame, 1)
         display_frame = frame.copy()
 
-        faces = app.get(frame)
+        if frame_idx % DETECT_EVERY == 0:
+            faces = app.get(frame)
+        frame_idx += 1
         status_color = (0, 0, 255)
         status_text = "No Face Detected"
 
@@ -108,6 +115,11 @@ def enroll(name_override: str | None = None, employee_id_override: str | None =
         key = cv2.waitKey(1) & 0xFF
 
         if key == ord("s") and len(faces) == 1:
+            # The preview may be a few frames old; register from this frame.
+            faces = app.get(frame)
+            if len(faces) != 1:
+                print("Face moved out of view. Try again.")
+                continue
             face = faces[0]
             payload = {
                 "name": name,
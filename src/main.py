@@ -1,18 +1,22 @@
+import asyncio
 import ipaddress
-import os
+import subprocess
+import sys
 from contextlib import asynccontextmanager
 from pathlib import Path
 
 from alembic.config import Config
+from alembic.runtime.migration import MigrationContext
+from alembic.script import ScriptDirectory
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import JSONResponse, ORJSONResponse
 from fastapi.staticfiles import StaticFiles
-from sqlalchemy import text
 
 from alembic import command  # type: ignore
 from src.config import settings
-from src.database import engine
+from src.database import AsyncSessionLocal, engine, warm_pool
 from src.redis_config import init_cache, shutdown_cache
 from src.routers import (
     attendance_router,
@@ -21,60 +25,108 @@ from src.routers import (
     persons_router,
     web_stream,
 )
+from src.services.recognition_cache import EmbeddingMatrix
+from src.utils.logging import get_logger
 
 WEBUI_DIR = Path(__file__).resolve().parent / "webui"
+ROOT_DIR = Path(__file__).resolve().parent.parent
+ALEMBIC_INI_PATH = ROOT_DIR / "alembic.ini"
+ALEMBIC_SCRIPT_DIR = ROOT_DIR / "alembic"
+
+logger = get_logger(__name__)
+
+
+def _alembic_config() -> Config:
+    alembic_cfg = Config(str(ALEMBIC_INI_PATH))
+    alembic_cfg.set_main_option("script_location", str(ALEMBIC_SCRIPT_DIR))
+    return alembic_cfg
+
+
+def _run_migrations() -> None:
+    command.upgrade(_alembic_config(), "head")
+
+
+def _current_revision(sync_conn) -> str | None:
+    return MigrationContext.configure(sync_conn).get_current_revision()
+
+
+async def _migrations_pending() -> bool:
+    head = ScriptDirectory.from_config(_alembic_config()).get_current_head()
+    async with engine.connect() as conn:
+        current = await conn.run_sync(_current_revision)
+    return current != head
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    print(f"Server starting up... DB URL: {settings.DATABASE_URL.split('@')[-1]}")
+    logger.info(
+        "Server starting up... DB URL: %s", settings.DATABASE_URL.split("@")[-1]
+    )
+    if settings.RUN_MIGRATIONS_ON_STARTUP:
+        try:
+            logger.info("Checking for database migrations...")
+            # Only run Alembic (and take its version-table lock) when the
+            # database is actually behind.
+            if await _migrations_pending():
+                # Alembic is synchronous and its env.py starts its own event
+                # loop, so it has to run off the server loop.
+                await asyncio.to_thread(_run_migrations)
+            logger.info("Database is up to date.")
+        except Exception as e:
+            logger.warning("Migration Warning: %s", e)
     try:
-        print(" Checking for database migrations...")
-        root_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-        alembic_ini_path = os.path.join(root_dir, "alembic.ini")
-
-        alembic_cfg = Config(alembic_ini_path)
-        alembic_cfg.set_main_option(
-            "script_location", os.path.join(root_dir, "alembic")
-        )
-        command.upgrade(alembic_cfg, "head")
-        print("Database is up to date.")
+        warmup = min(settings.DB_POOL_WARMUP, settings.DB_POOL_SIZE)
+        await warm_pool(warmup)
+        logger.info("Database connection established (%d pooled).", warmup)
     except Exception as e:
-        print(f" Migration Warning: {e}")
+        logger.critical("Database connection failed! %s", e)
+    app.state.embeddings = EmbeddingMatrix()
     try:
-        async with engine.begin() as conn:
-            await conn.execute(text("SELECT 1"))
-        print("Database connection established.")
+        async with AsyncSessionLocal() as session:
+            count = await app.state.embeddings.load(session)
+        logger.info("Loaded %d face embeddings into memory.", count)
     except Exception as e:
-        print(f"CRITICAL: Database connection failed! {e}")
+        # Matching falls back to the pgvector query.
+        logger.warning("Embedding cache load failed: %s", e)
     try:
-        await init_cache()
+        app.state.cache = await init_cache()
     except Exception as e:
-        print(f"CRITICAL: Cache initialization failed! {e}")
+        logger.critical("Cache initialization failed! %s", e)
         raise
 
     yield
 
-    print("Server shutting down...")
+    logger.info("Server shutting down...")
     await shutdown_cache()
     await engine.dispose()
 
 
-app = FastAPI(title=settings.PROJECT_NAME, version=settings.VERSION, lifespan=lifespan)
+app = FastAPI(
+    title=settings.PROJECT_NAME,
+    version=settings.VERSION,
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse,
+)
 
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    allow_origins=settings.CORS_ORIGINS,
+    allow_methods=["GET", "POST"],
+    allow_headers=["Authorization", "Content-Type", "X-API-Key"],
+    max_age=600,
 )
+# Dashboard polls return multi-KB JSON; tiny replies are left uncompressed.
+app.add_middleware(GZipMiddleware, minimum_size=512)
+
+
+# Forms uvicorn reports for local clients; anything else is parsed.
+_LOOPBACK_HOSTS = frozenset({"localhost", "127.0.0.1", "::1", "0:0:0:0:0:0:0:1"})
 
 
 def _is_loopback_host(host: str | None) -> bool:
     if not host:
         return False
-    if host == "localhost":
+    if host in _LOOPBACK_HOSTS:
         return True
     try:
         return ipaddress.ip_address(host).is_loopback
@@ -82,20 +134,23 @@ def _is_loopback_host(host: str | None) -> bool:
         return False
 
 
-@app.middleware("http")
 async def enforce_local_only_mode(request: Request, call_next):
-    if settings.LOCAL_ONLY:
-        client_host = request.client.host if request.client else None
-        if not _is_loopback_host(client_host):
-            return JSONResponse(
-                status_code=403,
-                content={
-                    "detail": "Local-only mode is enabled. Access is allowed only from this machine."
-                },
-            )
+    client_host = request.client.host if request.client else None
+    if not _is_loopback_host(client_host):
+        return JSONResponse(
+            status_code=403,
+            content={
+                "detail": "Local-only mode is enabled. Access is allowed only from this machine."
+            },
+        )
     return await call_next(request)
 
 
+# Only on the ASGI chain when needed; other deployments skip the hop.
+if settings.LOCAL_ONLY:
+    app.middleware("http")(enforce_local_only_mode)
+
+
 app.mount("/ui/static", StaticFiles(directory=str(WEBUI_DIR)), name="ui-static")
 
 # --- Register Routers ---
@@ -110,11 +165,18 @@ def start():
     import uvicorn
 
     host = "127.0.0.1" if settings.LOCAL_ONLY else settings.HOST
+    # Bring Redis up once here rather than in each worker's lifespan; a
+    # failure surfaces again as the cache error at startup.
+    subprocess.run([sys.executable, str(ROOT_DIR / "scripts" / "bootstrap_redis.py")])
     uvicorn.run(
         "src.main:app",
         host=host,
         port=settings.PORT,
         reload=settings.DEBUG,
+        # uvloop has no Windows build.
+        loop="asyncio" if sys.platform == "win32" else "uvloop",
+        http="httptools",
+        workers=None if settings.DEBUG else settings.WORKERS,
     )
 
 
@@ -1,5 +1,5 @@
-from .attendance import Attendance
+from .attendance import Attendance, AttendanceMethod
 from .base import Base
 from .person import Person
 
-__all__ = ["Base", "Person", "Attendance"]
+__all__ = ["Base", "Person", "Attendance", "AttendanceMethod"]
@@ -1,24 +1,44 @@
+import enum
 from datetime import date
 
-from sqlalchemy import Date, ForeignKey, UniqueConstraint
+from sqlalchemy import Date, ForeignKey, Index, UniqueConstraint
+from sqlalchemy import Enum as SAEnum
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from .base import Base, TimestampMixin
 
 
+class AttendanceMethod(str, enum.Enum):
+    FACE_BIO = "face_bio"
+    MANUAL = "manual_override"
+
+
 class Attendance(Base, TimestampMixin):
     __tablename__ = "attendance"
 
-    id: Mapped[int] = mapped_column(primary_key=True, index=True)
+    id: Mapped[int] = mapped_column(primary_key=True)
     person_id: Mapped[int] = mapped_column(
         ForeignKey("persons.id"), nullable=False, index=True
     )
-    date: Mapped[date] = mapped_column(Date, nullable=False, index=True)
-    method: Mapped[str] = mapped_column(server_default="face_bio")
+    date: Mapped[date] = mapped_column(Date, nullable=False)
+    # Native PG enum (4 bytes per row); labels are the member values.
+    method: Mapped[AttendanceMethod] = mapped_column(
+        SAEnum(
+            AttendanceMethod,
+            name="attendance_method",
+            values_callable=lambda members: [member.value for member in members],
+        ),
+        server_default=AttendanceMethod.FACE_BIO.value,
+    )
     confidence_score: Mapped[float] = mapped_column(nullable=True)
     person = relationship("Person", back_populates="attendance_logs")
     __table_args__ = (
         UniqueConstraint("person_id", "date", name="uq_person_attendance_daily"),
+        # Date-leading for "who was present on/between" reports; also
+        # serves plain date filters, so no separate date index is needed.
+        Index("ix_attendance_date_person", "date", "person_id"),
+        # Newest-first history/recent feeds; Postgres walks it backwards.
+        Index("ix_attendance_created_at", "created_at"),
     )
 
     def __repr__(self):
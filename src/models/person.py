@@ -1,16 +1,20 @@
 from typing import List, Optional
 
-from pgvector.sqlalchemy import Vector
-from sqlalchemy import Boolean, Index, String
-from sqlalchemy.orm import Mapped, mapped_column, relationship
+from pgvector.sqlalchemy import HALFVEC, Vector
+from sqlalchemy import Boolean, Index, String, cast, literal_column
+from sqlalchemy.orm import Mapped, mapped_column, relationship, validates
+
+from src.utils.vectors import l2_normalize
 
 from .base import Base, TimestampMixin
 
+HALF_EMBEDDING_SQL = "(embedding::halfvec(512))"
+
 
 class Person(Base, TimestampMixin):
     __tablename__ = "persons"
 
-    id: Mapped[int] = mapped_column(primary_key=True, index=True)
+    id: Mapped[int] = mapped_column(primary_key=True)
 
     name: Mapped[str] = mapped_column(String(100), nullable=False)
     employee_id: Mapped[Optional[str]] = mapped_column(
@@ -25,14 +29,27 @@ class Person(Base, TimestampMixin):
     )
 
     __table_args__ = (
+        # Embeddings are stored unit-length, so inner product ranks the
+        # same as cosine without the per-comparison norms. The graph holds
+        # half-precision copies (half the bytes per visited node); results
+        # are re-ranked on the full vectors. Queries must use the same
+        # expression, see HALF_EMBEDDING.
         Index(
-            "ix_persons_embedding_cosine",
-            "embedding",
+            "ix_persons_embedding_half_ip",
+            literal_column(HALF_EMBEDDING_SQL),
             postgresql_using="hnsw",
-            postgresql_with={"m": 16, "ef_construction": 64},
-            postgresql_ops={"embedding": "vector_cosine_ops"},
+            postgresql_with={"m": 16, "ef_construction": 200},
+            postgresql_ops={HALF_EMBEDDING_SQL: "halfvec_ip_ops"},
         ),
     )
 
+    @validates("embedding")
+    def _normalize_embedding(self, key, value):
+        return l2_normalize(value)
+
     def __repr__(self):
         return f"<Person(id={self.id}, name='{self.name}')>"
+
+
+# Matches the ix_persons_embedding_half_ip expression, so the planner uses it.
+HALF_EMBEDDING = cast(Person.embedding, HALFVEC(512))
@@ -1,72 +1,98 @@
 import asyncio
 import inspect
 import os
-import platform
-import shlex
-import shutil
-import subprocess
 from typing import Protocol
-from urllib.parse import urlparse
 
 import httpx
 from dotenv import load_dotenv
-from redis.asyncio import Redis
+from fastapi import Request
+from redis.asyncio import ConnectionPool, Redis
+
+from src.utils.logging import get_logger
 
 load_dotenv()
 
+logger = get_logger(__name__)
+
 CACHE_BACKEND = os.getenv("CACHE_BACKEND", "auto").strip().lower()
 REDIS_URL = os.getenv("REDIS_URL", "").strip()
 REDIS_HOST = os.getenv("REDIS_HOST", "localhost")
 REDIS_PORT = int(os.getenv("REDIS_PORT", 6379))
 REDIS_DB = int(os.getenv("REDIS_DB", 0))
+REDIS_MAX_CONNECTIONS = int(os.getenv("REDIS_MAX_CONNECTIONS", 50))
 UPSTASH_REDIS_REST_URL = os.getenv("UPSTASH_REDIS_REST_URL", "").strip()
 UPSTASH_REDIS_REST_TOKEN = os.getenv("UPSTASH_REDIS_REST_TOKEN", "").strip()
-AUTO_START_LOCAL_REDIS = os.getenv(
-    "AUTO_START_LOCAL_REDIS", "true"
-).strip().lower() in {"1", "true", "yes", "on"}
-LOCAL_REDIS_START_CMD = os.getenv("LOCAL_REDIS_START_CMD", "").strip()
-LOCAL_REDIS_START_TIMEOUT_SECONDS = float(
-    os.getenv("LOCAL_REDIS_START_TIMEOUT_SECONDS", "12")
-)
-PREFER_DOCKER_REDIS = os.getenv("PREFER_DOCKER_REDIS", "true").strip().lower() in {
-    "1",
-    "true",
-    "yes",
-    "on",
-}
-PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
 
 class CacheClient(Protocol):
-    async def get(self, key: str) -> str | None: ...
+    # Values may come back as str (REST) or raw bytes (TCP); callers only
+    # test for presence or decode themselves.
+    async def get(self, key: str) -> str | bytes | None: ...
+
+    async def mget(self, keys: list[str]) -> list[str | bytes | None]: ...
 
     async def setex(self, key: str, ttl_seconds: int, value: str) -> None: ...
 
+    async def msetex(self, items: dict[str, str], ttl_seconds: int) -> None: ...
+
     async def close(self) -> None: ...
 
 
 class RedisTcpCache:
-    def __init__(self, client: Redis):
-        self.client = client
+    def __init__(self, pool: ConnectionPool):
+        # Concurrent requests each check out their own socket from the pool.
+        self.pool = pool
+        self.client = Redis(connection_pool=pool)
 
-    async def get(self, key: str) -> str | None:
+    async def get(self, key: str) -> bytes | None:
         return await self.client.get(key)
 
+    async def mget(self, keys: list[str]) -> list[bytes | None]:
+        if not keys:
+            return []
+        return await self.client.mget(keys)
+
     async def setex(self, key: str, ttl_seconds: int, value: str) -> None:
         await self.client.setex(key, ttl_seconds, value)
 
+    async def msetex(self, items: dict[str, str], ttl_seconds: int) -> None:
+        if not items:
+            return
+        async with self.client.pipeline(transaction=False) as pipe:
+            for key, value in items.items():
+                pipe.setex(key, ttl_seconds, value)
+            await pipe.execute()
+
     async def close(self) -> None:
         close_result = self.client.close()
         if inspect.isawaitable(close_result):
             await close_result
+        # A pool passed in explicitly is not closed by the client.
+        await self.pool.disconnect()
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
 
 
 class UpstashRestCache:
     def __init__(self, rest_url: str, token: str):
+        # HTTP/2 (when h2 is installed) multiplexes concurrent commands
+        # over one TLS connection instead of one connection each.
         self.client = httpx.AsyncClient(
             base_url=rest_url.rstrip("/"),
             headers={"Authorization": f"Bearer {token}"},
-            timeout=5.0,
+            http2=_http2_available(),
+            limits=httpx.Limits(
+                max_connections=100,
+                max_keepalive_connections=50,
+                keepalive_expiry=30.0,
+            ),
+            timeout=httpx.Timeout(5.0, connect=2.0),
         )
 
     async def _run(self, *command: str) -> object | None:
@@ -79,6 +105,17 @@ class UpstashRestCache:
             return payload.get("result")
         return None
 
+    async def _pipeline(self, commands: list[list[str]]) -> list[object | None]:
+        """Send several commands in one HTTPS round trip."""
+        response = await self.client.post("/pipeline", json=commands)
+        response.raise_for_status()
+        results: list[object | None] = []
+        for item in response.json():
+            if isinstance(item, dict) and item.get("error"):
+                raise RuntimeError(str(item["error"]))
+            results.append(item.get("result") if isinstance(item, dict) else None)
+        return results
+
     async def ping(self) -> None:
         result = await self._run("PING")
         if str(result).upper() != "PONG":
@@ -90,278 +127,53 @@ class UpstashRestCache:
             return None
         return str(result)
 
+    async def mget(self, keys: list[str]) -> list[str | None]:
+        if not keys:
+            return []
+        results = await self._pipeline([["GET", key] for key in keys])
+        return [None if result is None else str(result) for result in results]
+
     async def setex(self, key: str, ttl_seconds: int, value: str) -> None:
         await self._run("SETEX", key, str(ttl_seconds), value)
 
+    async def msetex(self, items: dict[str, str], ttl_seconds: int) -> None:
+        if not items:
+            return
+        await self._pipeline(
+            [["SETEX", key, str(ttl_seconds), value] for key, value in items.items()]
+        )
+
     async def close(self) -> None:
         await self.client.aclose()
 
 
 _cache_client: CacheClient | None = None
 _cache_lock = asyncio.Lock()
-_local_redis_start_attempted = False
-_local_redis_start_lock = asyncio.Lock()
-
-
-def _redis_host_port() -> tuple[str, int]:
-    if REDIS_URL:
-        parsed = urlparse(REDIS_URL)
-        host = parsed.hostname or "localhost"
-        port = parsed.port or 6379
-        return host, port
-    return REDIS_HOST, REDIS_PORT
-
-
-def _is_local_redis_target() -> bool:
-    host, _ = _redis_host_port()
-    return host.strip("[]").lower() in {"localhost", "127.0.0.1", "::1"}
-
-
-def _parse_custom_start_command() -> list[str] | None:
-    if not LOCAL_REDIS_START_CMD:
-        return None
-    return shlex.split(LOCAL_REDIS_START_CMD, posix=os.name != "nt")
-
-
-def _is_running_in_container() -> bool:
-    if os.path.exists("/.dockerenv"):
-        return True
-
-    cgroup_path = "/proc/1/cgroup"
-    if os.path.exists(cgroup_path):
-        try:
-            with open(cgroup_path, "r", encoding="utf-8") as cgroup_file:
-                cgroup_text = cgroup_file.read().lower()
-            return any(
-                marker in cgroup_text
-                for marker in ("docker", "containerd", "kubepods", "podman")
-            )
-        except OSError:
-            return False
-    return False
-
-
-def _docker_start_commands() -> list[tuple[list[str], str | None]]:
-    compose_path = os.path.join(PROJECT_ROOT, "docker-compose.yml")
-    if not os.path.exists(compose_path):
-        return []
-
-    # Already in a container: skip docker CLI.
-    if _is_running_in_container():
-        return []
-
-    commands: list[tuple[list[str], str | None]] = []
-    if shutil.which("docker"):
-        commands.append((["docker", "compose", "up", "-d", "redis"], PROJECT_ROOT))
-    if shutil.which("docker-compose"):
-        commands.append((["docker-compose", "up", "-d", "redis"], PROJECT_ROOT))
-    return commands
-
-
-def _native_start_commands() -> list[tuple[list[str], str | None]]:
-    _, port = _redis_host_port()
-    system_name = platform.system().lower()
-    commands: list[tuple[list[str], str | None]] = []
-
-    def add_redis_server(executable: str) -> None:
-        if shutil.which(executable):
-            commands.append(
-                (
-                    [
-                        executable,
-                        "--port",
-                        str(port),
-                        "--save",
-                        "",
-                        "--appendonly",
-                        "no",
-                    ],
-                    None,
-                )
-            )
-
-    if system_name == "windows":
-        add_redis_server("redis-server.exe")
-        add_redis_server("redis-server")
-        if shutil.which("wsl"):
-            commands.append(
-                (
-                    [
-                        "wsl",
-                        "redis-server",
-                        "--port",
-                        str(port),
-                        "--save",
-                        "",
-                        "--appendonly",
-                        "no",
-                    ],
-                    None,
-                )
-            )
-    elif system_name == "darwin":
-        if shutil.which("brew"):
-            commands.append((["brew", "services", "start", "redis"], None))
-        add_redis_server("redis-server")
-    elif system_name == "linux":
-        if shutil.which("systemctl"):
-            commands.append((["systemctl", "--user", "start", "redis"], None))
-            commands.append((["systemctl", "--user", "start", "redis-server"], None))
-        if shutil.which("service"):
-            commands.append((["service", "redis-server", "start"], None))
-            commands.append((["service", "redis", "start"], None))
-        add_redis_server("redis-server")
-    else:
-        add_redis_server("redis-server")
-
-    return commands
-
-
-def _default_start_commands() -> list[tuple[list[str], str | None]]:
-    commands: list[tuple[list[str], str | None]] = []
-    docker_commands = _docker_start_commands()
-    native_commands = _native_start_commands()
-
-    if PREFER_DOCKER_REDIS:
-        commands.extend(docker_commands)
-        commands.extend(native_commands)
-    else:
-        commands.extend(native_commands)
-        commands.extend(docker_commands)
-
-    # Keep order, drop dupes.
-    seen: set[tuple[tuple[str, ...], str | None]] = set()
-    deduped: list[tuple[list[str], str | None]] = []
-    for command, cwd in commands:
-        key = (tuple(command), cwd)
-        if key in seen:
-            continue
-        seen.add(key)
-        deduped.append((command, cwd))
-    return deduped
-
-
-def _spawn_detached(command: list[str], cwd: str | None = None) -> None:
-    if os.name == "nt":
-        creationflags = getattr(subprocess, "CREATE_NEW_PROCESS_GROUP", 0) | getattr(
-            subprocess, "DETACHED_PROCESS", 0
-        )
-        subprocess.Popen(
-            command,
-            cwd=cwd,
-            stdin=subprocess.DEVNULL,
-            stdout=subprocess.DEVNULL,
-            stderr=subprocess.DEVNULL,
-            creationflags=creationflags,
-        )
-    else:
-        subprocess.Popen(
-            command,
-            cwd=cwd,
-            stdin=subprocess.DEVNULL,
-            stdout=subprocess.DEVNULL,
-            stderr=subprocess.DEVNULL,
-            start_new_session=True,
-        )
 
 
 async def _build_redis_cache() -> RedisTcpCache:
-    redis = (
-        Redis.from_url(REDIS_URL, decode_responses=True)
+    # Raw bytes: no per-reply UTF-8 decode; hiredis parses when installed.
+    pool = (
+        ConnectionPool.from_url(REDIS_URL, max_connections=REDIS_MAX_CONNECTIONS)
         if REDIS_URL
-        else Redis(
+        else ConnectionPool(
             host=REDIS_HOST,
             port=REDIS_PORT,
             db=REDIS_DB,
-            decode_responses=True,
+            max_connections=REDIS_MAX_CONNECTIONS,
         )
     )
+    cache = RedisTcpCache(pool)
     try:
-        ping_result = redis.ping()
+        ping_result = cache.client.ping()
         if inspect.isawaitable(ping_result):
             await ping_result
-        return RedisTcpCache(redis)
+        return cache
     except Exception:
-        close_result = redis.close()
-        if inspect.isawaitable(close_result):
-            await close_result
+        await cache.close()
         raise
 
 
-async def _wait_for_redis_ready(timeout_seconds: float) -> bool:
-    timeout = max(timeout_seconds, 1.0)
-    deadline = asyncio.get_running_loop().time() + timeout
-
-    while asyncio.get_running_loop().time() < deadline:
-        try:
-            cache = await _build_redis_cache()
-            await cache.close()
-            return True
-        except Exception:
-            await asyncio.sleep(0.5)
-
-    return False
-
-
-async def _start_local_redis_if_needed(original_error: Exception) -> None:
-    if not AUTO_START_LOCAL_REDIS:
-        raise RuntimeError(
-            "Redis is unavailable and automatic local startup is disabled "
-            "(AUTO_START_LOCAL_REDIS=false)."
-        ) from original_error
-
-    if not _is_local_redis_target():
-        host, port = _redis_host_port()
-        raise RuntimeError(
-            "Redis is unavailable and target is not local "
-            f"({host}:{port}), so automatic local startup is not possible."
-        ) from original_error
-
-    global _local_redis_start_attempted
-    async with _local_redis_start_lock:
-        if _local_redis_start_attempted:
-            return
-        _local_redis_start_attempted = True
-
-    commands: list[tuple[list[str], str | None]] = []
-    custom_command = _parse_custom_start_command()
-    if custom_command:
-        commands.append((custom_command, PROJECT_ROOT))
-    commands.extend(_default_start_commands())
-
-    print(
-        "Redis auto-start detection: "
-        f"os={platform.system()}, "
-        f"inside_container={_is_running_in_container()}, "
-        f"prefer_docker={PREFER_DOCKER_REDIS}"
-    )
-
-    if not commands:
-        raise RuntimeError(
-            "No local Redis startup command found for the detected environment. "
-            "Install redis-server, Docker/Docker Compose, or set "
-            "LOCAL_REDIS_START_CMD in .env."
-        ) from original_error
-
-    failures: list[str] = []
-    for command, cwd in commands:
-        try:
-            _spawn_detached(command, cwd)
-            if await _wait_for_redis_ready(LOCAL_REDIS_START_TIMEOUT_SECONDS):
-                print(f"Local Redis started automatically: {' '.join(command)}")
-                return
-            failures.append(
-                f"{' '.join(command)} (process launched but Redis not ready)"
-            )
-        except Exception as error:
-            failures.append(f"{' '.join(command)} ({error})")
-
-    joined = "; ".join(failures)
-    raise RuntimeError(f"Failed to auto-start local Redis. Attempts: {joined}") from (
-        original_error
-    )
-
-
 async def _build_cache_client() -> CacheClient:
     backend = CACHE_BACKEND
     if backend not in {"auto", "redis", "upstash_rest"}:
@@ -374,13 +186,13 @@ async def _build_cache_client() -> CacheClient:
             )
             try:
                 await upstash_cache.ping()
-                print("Cache backend: Upstash REST")
+                logger.info("Cache backend: Upstash REST")
                 return upstash_cache
             except Exception as error:
                 await upstash_cache.close()
-                print(f"Upstash REST unavailable: {error}")
+                logger.warning("Upstash REST unavailable: %s", error)
         elif backend == "upstash_rest":
-            print(
+            logger.warning(
                 "Upstash REST selected but credentials are missing. "
                 "Falling back to automatic cache detection."
             )
@@ -388,20 +200,30 @@ async def _build_cache_client() -> CacheClient:
     if backend in {"auto", "redis", "upstash_rest"}:
         try:
             cache = await _build_redis_cache()
-            print("Cache backend: Redis TCP")
+            logger.info("Cache backend: Redis TCP")
             return cache
         except Exception as error:
-            print(f"Redis unavailable: {error}")
-            await _start_local_redis_if_needed(error)
-            cache = await _build_redis_cache()
-            print("Cache backend: Redis TCP (auto-started local)")
-            return cache
+            # Starting a local Redis is scripts/bootstrap_redis.py's job, run
+            # once before the server; workers only connect.
+            raise RuntimeError(
+                f"Redis unavailable: {error}. Start it or run "
+                "`python scripts/bootstrap_redis.py` before the server."
+            ) from error
 
     raise RuntimeError(f"Unsupported CACHE_BACKEND: {backend}")
 
 
-async def init_cache() -> None:
-    await get_cache_client()
+async def redis_available() -> bool:
+    try:
+        cache = await _build_redis_cache()
+    except Exception:
+        return False
+    await cache.close()
+    return True
+
+
+async def init_cache() -> CacheClient:
+    return await get_cache_client()
 
 
 async def shutdown_cache() -> None:
@@ -423,6 +245,7 @@ async def get_cache_client() -> CacheClient:
         return _cache_client
 
 
-async def get_redis():
-    cache = await get_cache_client()
-    yield cache
+async def get_redis(request: Request) -> CacheClient:
+    # Set once in lifespan; a plain coroutine avoids both the lock check
+    # and the generator-dependency teardown per request.
+    return request.app.state.cache
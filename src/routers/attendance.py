@@ -1,8 +1,8 @@
 import datetime
-from typing import List, Optional
+from typing import List, Literal, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Query
-from pydantic import BaseModel
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from pydantic import BaseModel, Field, TypeAdapter, model_validator
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
@@ -12,44 +12,131 @@ from src.models.attendance import Attendance
 from src.redis_config import get_redis
 from src.schemas.attendance import AttendanceRead
 from src.services.attendance import AttendanceService
-from src.services.recognition import RecognitionService
+from src.services.recognition import RecognitionService, get_recognition_service
+from src.utils.vectors import decode_embedding_b64
 
 router = APIRouter(prefix="/attendance", tags=["attendance"])
 
 
+# Upper bound on faces per batch request; one camera frame rarely has more.
+MAX_BATCH_SIZE = 32
+
+WireDtype = Literal["f16", "i8"]
+
+_HISTORY_ADAPTER = TypeAdapter(List[AttendanceRead])
+
+
 class IdentifyRequest(BaseModel):
-    embedding: List[float]
+    embedding: List[float] = Field(default_factory=list)
+    # base64 of 512 packed values: f16 ~1 KB, i8 ~0.7 KB, vs ~8 KB of JSON.
+    embedding_b64: Optional[str] = None
+    dtype: WireDtype = "f16"
+    # Older clients: same as embedding_b64 with dtype "f16".
+    embedding_b16: Optional[str] = None
+    camera_id: str
+
+    @model_validator(mode="after")
+    def _decode_embedding(self) -> "IdentifyRequest":
+        if self.embedding_b64 is not None:
+            self.embedding = decode_embedding_b64(self.embedding_b64, self.dtype)
+        elif self.embedding_b16 is not None:
+            self.embedding = decode_embedding_b64(self.embedding_b16, "f16")
+        if not self.embedding:
+            raise ValueError("Either embedding or embedding_b64 is required")
+        return self
+
+
+class IdentifyBatchRequest(BaseModel):
+    embeddings: List[List[float]] = Field(
+        default_factory=list, max_length=MAX_BATCH_SIZE
+    )
+    embeddings_b64: Optional[List[str]] = Field(None, max_length=MAX_BATCH_SIZE)
+    dtype: WireDtype = "f16"
+    embeddings_b16: Optional[List[str]] = Field(None, max_length=MAX_BATCH_SIZE)
     camera_id: str
 
+    @model_validator(mode="after")
+    def _decode_embeddings(self) -> "IdentifyBatchRequest":
+        if self.embeddings_b64 is not None:
+            self.embeddings = [
+                decode_embedding_b64(value, self.dtype) for value in self.embeddings_b64
+            ]
+        elif self.embeddings_b16 is not None:
+            self.embeddings = [
+                decode_embedding_b64(value, "f16") for value in self.embeddings_b16
+            ]
+        if not self.embeddings:
+            raise ValueError("Either embeddings or embeddings_b64 is required")
+        return self
+
+
+def _verdict(name: Optional[str], employee_id: Optional[str], created: bool) -> dict:
+    if name is None:
+        return {"status": "unknown", "message": "No matching person found"}
+
+    if created:
+        return {
+            "status": "success",
+            "person_name": name,
+            "employee_id": employee_id,
+        }
+    else:
+        return {
+            "status": "ignored",
+            "message": "Attendance already marked recently",
+            "person_name": name,
+        }
+
 
 @router.post("/identify")
 async def identify_and_mark(
     request: IdentifyRequest,
     db: AsyncSession = Depends(get_db),
     cache=Depends(get_redis),
+    rec_service: RecognitionService = Depends(get_recognition_service),
 ):
-    rec_service = RecognitionService(db)
     att_service = AttendanceService(db, cache)
 
     person = await rec_service.find_nearest_match(request.embedding)
-
     if not person:
-        return {"status": "unknown", "message": "No matching person found"}
+        return _verdict(None, None, False)
 
-    record, created = await att_service.mark_attendance(person.id)
+    _, created = await att_service.mark_attendance(person.id)
+    return _verdict(person.name, person.employee_id, created)
 
-    if created:
-        return {
-            "status": "success",
-            "person_name": person.name,
-            "employee_id": person.employee_id,
-        }
-    else:
-        return {
-            "status": "ignored",
-            "message": "Attendance already marked recently",
-            "person_name": person.name,
-        }
+
+@router.post("/identify_batch")
+async def identify_and_mark_batch(
+    request: IdentifyBatchRequest,
+    db: AsyncSession = Depends(get_db),
+    cache=Depends(get_redis),
+    rec_service: RecognitionService = Depends(get_recognition_service),
+):
+    """
+    Identify every face from one camera tick in a single request.
+    Results are returned in the same order as the submitted embeddings.
+    """
+    att_service = AttendanceService(db, cache)
+
+    # All faces are matched in one query. Copy out the fields first: a
+    # rollback inside marking expires ORM rows.
+    people = await rec_service.find_nearest_batch(request.embeddings)
+    matches = [
+        (person.id, person.name, person.employee_id) if person else None
+        for person in people
+    ]
+
+    created_by_id = await att_service.mark_attendance_many(
+        [match[0] for match in matches if match]
+    )
+    return {
+        "results": [
+            _verdict(match[1], match[2], created_by_id[match[0]])
+            if match
+            else _verdict(None, None, False)
+            for match in matches
+        ]
+    }
 
 
 @router.get("/history", response_model=List[AttendanceRead])
@@ -66,14 +153,22 @@ async def get_attendance_history(
 
     if date:
         try:
-            filter_date = datetime.datetime.strptime(date, "%Y-%m-%d").date()
+            filter_date = datetime.date.fromisoformat(date)
             query = query.where(Attendance.date == filter_date)
         except ValueError:
             raise HTTPException(
-                status_code=400, detail="Invalid date format. Use YYYY-MM-DD"
+                status_code=400, detail="Invalid date. Use YYYY-MM-DD (ISO 8601)."
             )
 
     query = query.order_by(Attendance.created_at.desc()).offset(skip).limit(limit)
 
     result = await db.execute(query)
-    return result.scalars().all()
+    # Validate and encode straight to JSON bytes in pydantic-core; returning
+    # a Response skips FastAPI's second pass (response_model stays for docs).
+    records = _HISTORY_ADAPTER.validate_python(
+        result.scalars().all(), from_attributes=True
+    )
+    return Response(
+        content=_HISTORY_ADAPTER.dump_json(records, by_alias=True),
+        media_type="application/json",
+    )
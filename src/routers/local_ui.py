@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import ipaddress
+import json
 import platform
 import socket
 from datetime import date
@@ -11,12 +12,12 @@ from fastapi.responses import FileResponse
 from pydantic import BaseModel, Field
 from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
 
 from src.config import settings
 from src.database import get_db
 from src.models.attendance import Attendance
 from src.models.person import Person
+from src.redis_config import CacheClient, get_redis
 from src.services.script_runner import LocalScriptRunner, default_script_specs
 
 router = APIRouter(tags=["local-ui"])
@@ -25,6 +26,14 @@ PROJECT_ROOT = Path(__file__).resolve().parents[2]
 WEBUI_DIR = PROJECT_ROOT / "src" / "webui"
 SCRIPT_RUNNER = LocalScriptRunner(PROJECT_ROOT, default_script_specs())
 
+# Fixed for the life of the process; no need to ask the OS on every poll.
+_HOSTNAME = socket.gethostname()
+_PLATFORM = platform.platform()
+_PYTHON_VERSION = platform.python_version()
+
+DB_SUMMARY_CACHE_KEY = "ui:db_summary"
+DB_SUMMARY_TTL_SECONDS = 5
+
 
 class ScriptStartRequest(BaseModel):
     name: str | None = Field(default=None, max_length=100)
@@ -63,16 +72,43 @@ def _status_to_step(script_status: str) -> str:
     return "action"
 
 
-async def _db_summary(db: AsyncSession) -> dict[str, int | str | bool | None]:
+async def _db_summary(
+    db: AsyncSession, cache: CacheClient
+) -> dict[str, int | str | bool | None]:
+    # The dashboard polls; a few seconds of staleness saves the DB query.
     try:
-        people_count_result = await db.execute(select(func.count(Person.id)))
-        attendance_today_result = await db.execute(
-            select(func.count(Attendance.id)).where(Attendance.date == date.today())
+        cached = await cache.get(DB_SUMMARY_CACHE_KEY)
+        if cached:
+            return json.loads(cached)
+    except Exception:
+        pass
+
+    summary = await _query_db_summary(db)
+    if summary["db_status"] == "up":
+        try:
+            await cache.setex(
+                DB_SUMMARY_CACHE_KEY, DB_SUMMARY_TTL_SECONDS, json.dumps(summary)
+            )
+        except Exception:
+            pass
+    return summary
+
+
+async def _query_db_summary(db: AsyncSession) -> dict[str, int | str | bool | None]:
+    try:
+        # Both counts as scalar subqueries of one SELECT: one round trip.
+        people_count = select(func.count(Person.id)).scalar_subquery()
+        attendance_today = (
+            select(func.count(Attendance.id))
+            .where(Attendance.date == date.today())
+            .scalar_subquery()
         )
+        result = await db.execute(select(people_count, attendance_today))
+        people, attended = result.one()
         return {
             "db_status": "up",
-            "people_count": int(people_count_result.scalar_one() or 0),
-            "attendance_today": int(attendance_today_result.scalar_one() or 0),
+            "people_count": int(people or 0),
+            "attendance_today": int(attended or 0),
             "db_error": None,
         }
     except Exception as exc:
@@ -94,17 +130,21 @@ async def serve_dashboard(request: Request):
 
 
 @router.get("/ui/api/overview")
-async def dashboard_overview(request: Request, db: AsyncSession = Depends(get_db)):
+async def dashboard_overview(
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+    cache: CacheClient = Depends(get_redis),
+):
     ensure_local_access(request)
-    db_data = await _db_summary(db)
+    db_data = await _db_summary(db, cache)
     running = [s for s in SCRIPT_RUNNER.list_scripts() if s["status"] == "running"]
 
     return {
         "project": settings.PROJECT_NAME,
         "version": settings.VERSION,
-        "hostname": socket.gethostname(),
-        "platform": platform.platform(),
-        "python": platform.python_version(),
+        "hostname": _HOSTNAME,
+        "platform": _PLATFORM,
+        "python": _PYTHON_VERSION,
         "local_only": settings.LOCAL_ONLY,
         "running_scripts": len(running),
         **db_data,
@@ -166,9 +206,13 @@ async def read_logs(
 
 
 @router.get("/ui/api/onboarding")
-async def onboarding_status(request: Request, db: AsyncSession = Depends(get_db)):
+async def onboarding_status(
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+    cache: CacheClient = Depends(get_redis),
+):
     ensure_local_access(request)
-    db_data = await _db_summary(db)
+    db_data = await _db_summary(db, cache)
     scripts = {item["id"]: item for item in SCRIPT_RUNNER.list_scripts()}
 
     people_count = db_data.get("people_count")
@@ -228,25 +272,31 @@ async def recent_attendance(
 ):
     ensure_local_access(request)
     try:
+        # One joined query for just the displayed columns; no Person objects.
         query = (
-            select(Attendance)
-            .options(selectinload(Attendance.person))
+            select(
+                Attendance.id,
+                Attendance.method,
+                Attendance.date,
+                Attendance.created_at,
+                Person.name,
+                Person.employee_id,
+            )
+            .join(Person, Attendance.person_id == Person.id, isouter=True)
             .order_by(Attendance.created_at.desc())
             .limit(limit)
         )
         result = await db.execute(query)
         rows = []
-        for record in result.scalars().all():
+        for row in result.all():
             rows.append(
                 {
-                    "id": record.id,
-                    "person_name": record.person.name if record.person else "Unknown",
-                    "employee_id": (
-                        record.person.employee_id if record.person else None
-                    ),
-                    "method": record.method,
-                    "date": str(record.date),
-                    "time": record.created_at.strftime("%H:%M:%S"),
+                    "id": row.id,
+                    "person_name": row.name if row.name is not None else "Unknown",
+                    "employee_id": row.employee_id,
+                    "method": row.method,
+                    "date": str(row.date),
+                    "time": row.created_at.strftime("%H:%M:%S"),
                 }
             )
         return {"records": rows}
@@ -6,13 +6,17 @@ from sqlalchemy.future import select
 from src.database import get_db
 from src.models.person import Person
 from src.schemas.person import PersonCreate, PersonRead
-from src.services.recognition import RecognitionService
+from src.services.recognition import RecognitionService, get_recognition_service
 
 router = APIRouter(prefix="/persons", tags=["persons"])
 
 
 @router.post("/register", response_model=PersonRead)
-async def register_person(person_in: PersonCreate, db: AsyncSession = Depends(get_db)):
+async def register_person(
+    person_in: PersonCreate,
+    db: AsyncSession = Depends(get_db),
+    rec_service: RecognitionService = Depends(get_recognition_service),
+):
     """Register person and block duplicate IDs or embeddings."""
 
     if person_in.employee_id:
@@ -24,8 +28,7 @@ async def register_person(person_in: PersonCreate, db: AsyncSession = Depends(ge
                 detail=f"Employee ID '{person_in.employee_id}' already registered.",
             )
 
-    rec_service = RecognitionService(db)
-    existing_person = await rec_service.find_nearest_match(person_in.embedding)
+    existing_person = await rec_service.find_registered_match(person_in.embedding)
 
     if existing_person:
         raise HTTPException(
@@ -45,6 +48,8 @@ async def register_person(person_in: PersonCreate, db: AsyncSession = Depends(ge
     try:
         await db.commit()
         await db.refresh(new_person)
+        if new_person.is_active and rec_service.matrix is not None:
+            await rec_service.matrix.add(new_person.id, new_person.embedding)
         return new_person
     except IntegrityError:
         await db.rollback()
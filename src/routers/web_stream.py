@@ -1,39 +1,69 @@
+import asyncio
 import ipaddress
-from typing import List
+from typing import Dict
 
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
 
 from src.config import settings
+from src.utils.logging import get_logger
+
+try:
+    from xxhash import xxh3_64_intdigest as _frame_hash
+except ImportError:
+    from zlib import crc32 as _frame_hash
 
 router = APIRouter(prefix="/ws", tags=["streaming"])
+logger = get_logger(__name__)
 
 
 class ConnectionManager:
     def __init__(self):
-        self.active_connections: List[WebSocket] = []
+        # Latest-wins: one shared frame slot; each viewer's writer task
+        # sends whatever is newest when it is ready, skipping the rest.
+        self.active_connections: Dict[WebSocket, asyncio.Task] = {}
+        self.latest: bytes = b""
+        self.new_frame = asyncio.Event()
 
     async def connect(self, websocket: WebSocket):
         await websocket.accept()
-        self.active_connections.append(websocket)
+        self.active_connections[websocket] = asyncio.create_task(
+            self._writer(websocket)
+        )
 
     def disconnect(self, websocket: WebSocket):
-        self.active_connections.remove(websocket)
+        # A failed send may have pruned it already.
+        task = self.active_connections.pop(websocket, None)
+        if task is not None and task is not asyncio.current_task():
+            task.cancel()
 
-    async def broadcast_video(self, frame_bytes: bytes):
-        """Send binary video frame to all browsers"""
-        for connection in self.active_connections:
+    async def _writer(self, websocket: WebSocket):
+        while True:
+            await self.new_frame.wait()
             try:
-                await connection.send_bytes(frame_bytes)
+                await websocket.send_bytes(self.latest)
             except Exception:
-                continue
+                self.disconnect(websocket)
+                return
+
+    async def broadcast_video(self, frame_bytes: bytes):
+        """Publish binary video frame; viewers pick it up when ready"""
+        self.latest = frame_bytes
+        # set() wakes every current waiter; clearing right away makes each
+        # writer wait for the next frame after it finishes sending.
+        self.new_frame.set()
+        self.new_frame.clear()
 
     async def broadcast_notification(self, data: dict):
         """Send JSON check-in data (Name, Time, Status) for Toasts"""
-        for connection in self.active_connections:
-            try:
-                await connection.send_json(data)
-            except Exception:
-                continue
+        # Sent directly: check-ins must not be skipped like stale frames.
+        connections = list(self.active_connections)
+        results = await asyncio.gather(
+            *(connection.send_json(data) for connection in connections),
+            return_exceptions=True,
+        )
+        for connection, result in zip(connections, results):
+            if isinstance(result, Exception):
+                self.disconnect(connection)
 
 
 manager = ConnectionManager()
@@ -77,9 +107,15 @@ async def video_input_endpoint(websocket: WebSocket):
 
     """Receive frames from camera client and fan out to viewers."""
     await websocket.accept()
+    prev_hash = None
     try:
         while True:
             data = await websocket.receive_bytes()
+            # Static scenes can repeat the exact same JPEG; skip the fan-out.
+            frame_hash = _frame_hash(data)
+            if frame_hash == prev_hash:
+                continue
+            prev_hash = frame_hash
             await manager.broadcast_video(data)
     except WebSocketDisconnect:
-        print("Camera Client Disconnected")
+        logger.info("Camera Client Disconnected")
@@ -3,11 +3,15 @@ from typing import Optional
 
 from pydantic import BaseModel, ConfigDict, Field
 
+from src.models.attendance import AttendanceMethod
+
 from .person import PersonRead
 
 
 class AttendanceBase(BaseModel):
-    method: str = Field("face_bio", examples=["face_bio", "manual", "qr"])
+    method: AttendanceMethod = Field(
+        AttendanceMethod.FACE_BIO, examples=["face_bio", "manual_override"]
+    )
     confidence_score: Optional[float] = Field(None, ge=0.0, le=1.0)
 
 
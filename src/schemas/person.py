@@ -1,7 +1,9 @@
 from datetime import datetime
-from typing import List, Optional
+from typing import List, Literal, Optional
 
-from pydantic import BaseModel, ConfigDict, Field
+from pydantic import BaseModel, ConfigDict, Field, model_validator
+
+from src.utils.vectors import EMBEDDING_DIM, decode_embedding_b64
 
 
 class PersonBase(BaseModel):
@@ -12,9 +14,24 @@ class PersonBase(BaseModel):
 
 
 class PersonCreate(PersonBase):
-    embedding: List[float] = Field(
-        ..., min_length=512, max_length=512, description="512-dim face vector"
+    embedding: Optional[List[float]] = Field(
+        None,
+        min_length=EMBEDDING_DIM,
+        max_length=EMBEDDING_DIM,
+        description="512-dim face vector",
+    )
+    embedding_b64: Optional[str] = Field(
+        None, description="base64 of 512 packed values, see dtype"
     )
+    dtype: Literal["f16", "i8"] = "f16"
+
+    @model_validator(mode="after")
+    def _decode_embedding(self) -> "PersonCreate":
+        if self.embedding_b64 is not None:
+            self.embedding = decode_embedding_b64(self.embedding_b64, self.dtype)
+        if self.embedding is None:
+            raise ValueError("Either embedding or embedding_b64 is required")
+        return self
 
 
 class PersonRead(PersonBase):
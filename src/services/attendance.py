@@ -1,9 +1,9 @@
 import datetime
 
-from sqlalchemy.exc import IntegrityError
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.models.attendance import Attendance
+from src.models.attendance import Attendance, AttendanceMethod
 from src.redis_config import CacheClient
 
 
@@ -12,40 +12,95 @@ class AttendanceService:
         self.db = db
         self.cache = cache
 
+    @staticmethod
+    def _cache_key(person_id: int, today: datetime.date) -> str:
+        return f"attendance:{person_id}:{today}"
+
     async def _is_recently_marked(self, key: str) -> bool:
         try:
             return bool(await self.cache.get(key))
         except Exception:
             return False
 
+    async def _recently_marked_many(self, keys: list[str]) -> list[bool]:
+        try:
+            return [bool(value) for value in await self.cache.mget(keys)]
+        except Exception:
+            return [False] * len(keys)
+
     async def _mark_recently_marked(self, key: str) -> None:
         try:
             await self.cache.setex(key, 43200, "marked")
         except Exception:
             return
 
+    async def _mark_recently_marked_many(self, keys: list[str]) -> None:
+        try:
+            await self.cache.msetex(dict.fromkeys(keys, "marked"), 43200)
+        except Exception:
+            return
+
+    async def _insert_many(
+        self, person_ids: list[int], today: datetime.date
+    ) -> dict[int, int]:
+        """Insert today's rows; returns person_id -> new id for rows created."""
+        # ON CONFLICT on uq_person_attendance_daily: a duplicate is simply
+        # not returned, so racing frames never cost a failed commit.
+        stmt = (
+            insert(Attendance)
+            .values(
+                [
+                    {
+                        "person_id": person_id,
+                        "date": today,
+                        "method": AttendanceMethod.FACE_BIO,
+                        "confidence_score": 0.99,
+                    }
+                    for person_id in person_ids
+                ]
+            )
+            .on_conflict_do_nothing(index_elements=["person_id", "date"])
+            .returning(Attendance.person_id, Attendance.id)
+        )
+        result = await self.db.execute(stmt)
+        await self.db.commit()
+        return dict(result.all())
+
     async def mark_attendance(self, person_id: int):
         today = datetime.date.today()
-        cache_key = f"attendance:{person_id}:{today}"
+        cache_key = self._cache_key(person_id, today)
 
         if await self._is_recently_marked(cache_key):
             return None, False
 
-        try:
-            new_record = Attendance(
-                person_id=person_id,
-                date=today,
-                method="face_bio",
-                confidence_score=0.99,
-            )
-            self.db.add(new_record)
-            await self.db.commit()
-            await self.db.refresh(new_record)
+        inserted = await self._insert_many([person_id], today)
+        await self._mark_recently_marked(cache_key)
+        return inserted.get(person_id), person_id in inserted
 
-            await self._mark_recently_marked(cache_key)
-            return new_record, True
+    async def mark_attendance_many(self, person_ids: list[int]) -> dict[int, bool]:
+        """
+        Mark several people at once; returns person_id -> created.
+        The cache and the database are each hit with one round trip.
+        """
+        today = datetime.date.today()
+        person_ids = list(dict.fromkeys(person_ids))
+        keys = [self._cache_key(person_id, today) for person_id in person_ids]
 
-        except IntegrityError:
-            await self.db.rollback()
-            await self._mark_recently_marked(cache_key)
-            return None, False
+        created_by_id: dict[int, bool] = {}
+        newly_marked: list[str] = []
+        marked_flags = await self._recently_marked_many(keys)
+        to_insert: list[int] = []
+        for person_id, key, marked in zip(person_ids, keys, marked_flags):
+            if marked:
+                created_by_id[person_id] = False
+                continue
+            to_insert.append(person_id)
+            newly_marked.append(key)
+
+        if to_insert:
+            inserted = await self._insert_many(to_insert, today)
+            for person_id in to_insert:
+                created_by_id[person_id] = person_id in inserted
+
+        await self._mark_recently_marked_many(newly_marked)
+        return created_by_id
@@ -0,0 +1,48 @@
+"""Numeric kernels for the in-process embedding search.
+
+Numba is optional. When it is installed the loops are compiled (and
+cached on disk) with fastmath and run across rows in parallel;
+otherwise the NumPy matrix-vector product is used.
+"""
+
+import numpy as np
+
+try:
+    from numba import njit, prange
+except ImportError:
+    njit = None
+
+
+def _cosine_distances_numpy(query: np.ndarray, matrix: np.ndarray) -> np.ndarray:
+    return 1.0 - matrix @ query
+
+
+if njit is not None:
+
+    @njit("f4[::1](f4[::1], f4[:, ::1])", fastmath=True, parallel=True, cache=True)
+    def _cosine_distances_jit(query, matrix):
+        # Rows and query are unit-length, so the distance is 1 - dot.
+        out = np.empty(matrix.shape[0], dtype=np.float32)
+        for i in prange(matrix.shape[0]):
+            dot = np.float32(0.0)
+            for k in range(matrix.shape[1]):
+                dot += query[k] * matrix[i, k]
+            out[i] = 1.0 - dot
+        return out
+
+    _cosine_distances = _cosine_distances_jit
+else:
+    _cosine_distances = _cosine_distances_numpy
+
+
+def cosine_distances(query: np.ndarray, matrix: np.ndarray) -> np.ndarray:
+    """1 - dot of a unit (D,) query against every row of a unit (N, D) matrix."""
+    return _cosine_distances(
+        np.ascontiguousarray(query, dtype=np.float32),
+        np.ascontiguousarray(matrix, dtype=np.float32),
+    )
+
+
+def warmup(dim: int) -> None:
+    """Compile (or load from the cache) before the first request needs it."""
+    cosine_distances(np.zeros(dim, np.float32), np.zeros((1, dim), np.float32))
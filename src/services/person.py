@@ -1,7 +1,8 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.future import select
 
-from src.models.person import Person
+from src.config import settings
+from src.services.recognition import NEAREST_PERSON
+from src.utils.vectors import l2_normalize
 
 
 class PersonService:
@@ -9,12 +10,13 @@ class PersonService:
         self.db = db
 
     async def identify_person(self, embedding: list):
-        """Return the nearest person match by cosine distance."""
-        query = (
-            select(Person)
-            .order_by(Person.embedding.cosine_distance(embedding))
-            .limit(1)
+        """Return the nearest person within SIMILARITY_THRESHOLD, if any."""
+        result = await self.db.execute(
+            NEAREST_PERSON,
+            {
+                "probe": l2_normalize(embedding),
+                "candidates": settings.HNSW_EF_SEARCH_MATCH,
+            },
         )
-        result = await self.db.execute(query)
         person = result.scalar_one_or_none()
         return person
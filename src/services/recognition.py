@@ -1,36 +1,251 @@
 from typing import List, Optional
 
-from sqlalchemy import select
+import numpy as np
+from fastapi import Depends
+from pgvector.sqlalchemy import HALFVEC, Vector
+from sqlalchemy import (
+    Integer,
+    Select,
+    bindparam,
+    cast,
+    column,
+    select,
+    text,
+    true,
+    values,
+)
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
 
 from src.config import settings
-from src.models.person import Person
+from src.database import get_db
+from src.models.person import HALF_EMBEDDING, Person
+from src.services.recognition_cache import EmbeddingMatrix, get_embedding_matrix
+from src.services.similarity_cache import similarity_cache
+from src.utils.vectors import EMBEDDING_DIM, l2_normalize
+
+
+def _nearest_person_statement(active_only: bool) -> Select:
+    """Closest person to a unit-length :probe within SIMILARITY_THRESHOLD."""
+    # Stored embeddings are unit-length, so negative inner product (<#>)
+    # equals cosine distance - 1. The halfvec HNSW index picks :candidates
+    # rows; they are re-ranked on the full-precision vectors. The threshold
+    # sits in the WHERE clause so an unknown face comes back empty.
+    probe = bindparam("probe", type_=Vector(EMBEDDING_DIM))
+    shortlist = (
+        select(Person.id)
+        .order_by(HALF_EMBEDDING.max_inner_product(cast(probe, HALFVEC(EMBEDDING_DIM))))
+        .limit(bindparam("candidates", type_=Integer))
+    )
+    if active_only:
+        shortlist = shortlist.where(Person.is_active)
+    shortlist = shortlist.subquery()
+    neg_ip = Person.embedding.max_inner_product(probe)
+    return (
+        select(Person)
+        .join(shortlist, Person.id == shortlist.c.id)
+        .where(neg_ip < settings.SIMILARITY_THRESHOLD - 1.0)
+        .order_by(neg_ip)
+        .limit(1)
+    )
+
+
+# Built once: callers only bind values, and the SQL text (and so
+# asyncpg's per-connection prepared statement) is the same every call.
+# Deactivated people never match at check-in, the same rule as the
+# in-process matrix; registration still checks against every row.
+NEAREST_PERSON = _nearest_person_statement(active_only=True)
+NEAREST_ENROLLED_PERSON = _nearest_person_statement(active_only=False)
+
+
+def nearest_people_query(probes: List[np.ndarray], candidates: int) -> Select:
+    """NEAREST_PERSON for several probes at once, as (index, Person) rows."""
+    # One LATERAL search per VALUES row; probes without a match within the
+    # threshold have no row.
+    queries = values(
+        column("idx", Integer),
+        column("probe", Vector(EMBEDDING_DIM)),
+        name="queries",
+    ).data(list(enumerate(probes)))
+    # VALUES columns are untyped in the SQL, so the probes arrive as text.
+    probe = cast(queries.c.probe, Vector(EMBEDDING_DIM))
+    candidate = aliased(Person)
+    shortlist = (
+        select(candidate.id)
+        .where(candidate.is_active)
+        .order_by(
+            cast(candidate.embedding, HALFVEC(EMBEDDING_DIM)).max_inner_product(
+                cast(probe, HALFVEC(EMBEDDING_DIM))
+            )
+        )
+        .limit(candidates)
+        .correlate(queries)
+    )
+    neg_ip = Person.embedding.max_inner_product(probe)
+    best = (
+        select(Person.id)
+        .where(Person.id.in_(shortlist))
+        .where(neg_ip < settings.SIMILARITY_THRESHOLD - 1.0)
+        .order_by(neg_ip)
+        .limit(1)
+        .correlate(queries)
+        .lateral("best")
+    )
+    return (
+        select(queries.c.idx, Person)
+        .select_from(queries)
+        .join(best, true())
+        .join(Person, Person.id == best.c.id)
+    )
 
 
 class RecognitionService:
-    def __init__(self, db: AsyncSession):
+    def __init__(self, db: AsyncSession, matrix: Optional[EmbeddingMatrix] = None):
         self.db = db
+        self.matrix = matrix
+        self._ef_search_scope: tuple[object, int] | None = None
+
+    async def _set_ef_search(self, ef_search: int) -> None:
+        """Apply hnsw.ef_search for the rest of the current transaction."""
+        # SET LOCAL takes no bind parameters; set_config(..., true) does.
+        # Skip the round trip if this transaction already has the value.
+        transaction = self.db.sync_session.get_transaction()
+        if transaction is not None and self._ef_search_scope == (
+            transaction,
+            ef_search,
+        ):
+            return
+        await self.db.execute(
+            text("SELECT set_config('hnsw.ef_search', :ef_search, true)"),
+            {"ef_search": str(ef_search)},
+        )
+        self._ef_search_scope = (self.db.sync_session.get_transaction(), ef_search)
+
+    async def find_registered_match(self, embedding: List[float]) -> Optional[Person]:
+        """Return the nearest person within threshold, inactive ones included."""
+        # Registration must also reject a deactivated person's face, so this
+        # skips the similarity cache and the matrix (active rows only).
+        await self._set_ef_search(settings.HNSW_EF_SEARCH_BULK)
+        result = await self.db.execute(
+            NEAREST_ENROLLED_PERSON,
+            {
+                "probe": l2_normalize(embedding),
+                "candidates": settings.HNSW_EF_SEARCH_BULK,
+            },
+        )
+        return result.scalars().first()
 
-    async def find_nearest_match(self, embedding: List[float]) -> Optional[Person]:
+    async def find_nearest_match(
+        self, embedding: List[float], ef_search: Optional[int] = None
+    ) -> Optional[Person]:
         """Return nearest match if distance is below threshold."""
 
-        query_with_dist = (
-            select(
-                Person, Person.embedding.cosine_distance(embedding).label("distance")
-            )
-            .order_by("distance")
-            .limit(1)
+        cached_id = similarity_cache.get(embedding)
+        if cached_id is not None:
+            person = await self.db.get(Person, cached_id)
+            if _still_matches(person, embedding):
+                return person
+            # Deactivated or re-enrolled since the query was cached.
+            similarity_cache.discard(cached_id)
+
+        person = await self._search(embedding, ef_search)
+        if person is not None:
+            similarity_cache.put(embedding, person.id)
+        return person
+
+    async def _search(
+        self, embedding: List[float], ef_search: Optional[int]
+    ) -> Optional[Person]:
+        if self.matrix is not None and self.matrix.loaded:
+            # Exact scan over the in-process matrix; only the winner is
+            # fetched from the database.
+            match = self.matrix.nearest(embedding)
+            if match is None or match[1] >= settings.SIMILARITY_THRESHOLD:
+                return None
+            person = await self.db.get(Person, match[0])
+            # The matrix is only reloaded at startup.
+            return person if person is not None and person.is_active else None
+
+        ef_search = ef_search or settings.HNSW_EF_SEARCH_MATCH
+        await self._set_ef_search(ef_search)
+        result = await self.db.execute(
+            NEAREST_PERSON,
+            {"probe": l2_normalize(embedding), "candidates": ef_search},
+        )
+        return result.scalars().first()
+
+    async def _load_active(self, person_ids: set[int]) -> dict[int, Person]:
+        result = await self.db.execute(
+            select(Person).where(Person.id.in_(person_ids), Person.is_active)
         )
+        return {person.id: person for person in result.scalars()}
+
+    async def find_nearest_batch(
+        self, embeddings: List[List[float]], ef_search: Optional[int] = None
+    ) -> List[Optional[Person]]:
+        """find_nearest_match for every embedding, in input order."""
+        person_ids: List[Optional[int]] = [
+            similarity_cache.get(embedding) for embedding in embeddings
+        ]
+        found: dict[int, Person] = {}
+
+        cached_ids = {person_id for person_id in person_ids if person_id is not None}
+        if cached_ids:
+            found = await self._load_active(cached_ids)
+            for i, person_id in enumerate(person_ids):
+                if person_id is not None and not _still_matches(
+                    found.get(person_id), embeddings[i]
+                ):
+                    similarity_cache.discard(person_id)
+                    person_ids[i] = None
+
+        misses = [i for i, person_id in enumerate(person_ids) if person_id is None]
+        if self.matrix is not None and self.matrix.loaded:
+            matches = self.matrix.nearest_many([embeddings[i] for i in misses])
+            for i, match in zip(misses, matches):
+                if match is not None and match[1] < settings.SIMILARITY_THRESHOLD:
+                    person_ids[i] = match[0]
+        elif misses:
+            # One round trip for every face the cache did not answer.
+            ef_search = ef_search or settings.HNSW_EF_SEARCH_MATCH
+            await self._set_ef_search(ef_search)
+            result = await self.db.execute(
+                nearest_people_query(
+                    [l2_normalize(embeddings[i]) for i in misses], candidates=ef_search
+                )
+            )
+            for idx, person in result.all():
+                person_ids[misses[idx]] = person.id
+                found[person.id] = person
+
+        wanted = {person_id for person_id in person_ids if person_id is not None}
+        wanted -= found.keys()
+        if wanted:
+            found.update(await self._load_active(wanted))
 
-        result = await self.db.execute(query_with_dist)
-        match = result.first()
+        people = [
+            found.get(person_id) if person_id is not None else None
+            for person_id in person_ids
+        ]
+        for i in misses:
+            if people[i] is not None:
+                similarity_cache.put(embeddings[i], people[i].id)
+        return people
 
-        if not match:
-            return None
 
-        person_obj, distance = match
+def _still_matches(person: Optional[Person], embedding: List[float]) -> bool:
+    """Whether a cached match holds: active and within threshold of the probe."""
+    if person is None or not person.is_active:
+        return False
+    # Both sides unit-length: cosine distance is 1 - dot product.
+    similarity = float(
+        np.dot(np.asarray(person.embedding, dtype=np.float32), l2_normalize(embedding))
+    )
+    return 1.0 - similarity < settings.SIMILARITY_THRESHOLD
 
-        if distance < settings.SIMILARITY_THRESHOLD:
-            return person_obj
 
-        return None
+async def get_recognition_service(
+    db: AsyncSession = Depends(get_db),
+    matrix: EmbeddingMatrix = Depends(get_embedding_matrix),
+) -> RecognitionService:
+    return RecognitionService(db, matrix)
@@ -0,0 +1,151 @@
+"""In-process copy of every active person's embedding for face matching.
+
+SimSIMD is optional. When it is installed the cosine distances come from
+its SIMD kernels; otherwise from services/kernels.py (Numba when
+available, else NumPy). Rows are unit-length, so all give the same
+distances.
+
+hnswlib is optional too. With it installed and at least HNSW_MIN_ROWS
+people enrolled, lookups go through an in-process HNSW graph instead of
+the exact scan.
+
+The matrix is per process: with several workers, a person registered
+through one worker is only seen by the others after their next restart.
+"""
+
+import asyncio
+from typing import Sequence
+
+import numpy as np
+from fastapi import Request
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.models.person import Person
+from src.services import kernels
+from src.utils.vectors import EMBEDDING_DIM
+
+try:
+    import simsimd
+except ImportError:
+    simsimd = None
+
+try:
+    import hnswlib
+except ImportError:
+    hnswlib = None
+
+# Below this an exact scan is already sub-millisecond and needs no graph.
+HNSW_MIN_ROWS = 2000
+HNSW_M = 16
+HNSW_EF_CONSTRUCTION = 200
+HNSW_EF_SEARCH = 64
+
+
+def _unit_rows(values) -> np.ndarray:
+    matrix = np.asarray(values, dtype=np.float32).reshape(-1, EMBEDDING_DIM)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / (norms + 1e-12)
+
+
+def _build_hnsw(matrix: np.ndarray, ids: list[int]):
+    if hnswlib is None or len(ids) < HNSW_MIN_ROWS:
+        return None
+    # "ip" distance is 1 - dot, i.e. cosine distance on unit rows; labels
+    # are the person ids themselves.
+    index = hnswlib.Index(space="ip", dim=EMBEDDING_DIM)
+    index.init_index(
+        max_elements=2 * len(ids), ef_construction=HNSW_EF_CONSTRUCTION, M=HNSW_M
+    )
+    index.add_items(matrix, np.asarray(ids, dtype=np.int64))
+    index.set_ef(HNSW_EF_SEARCH)
+    return index
+
+
+class EmbeddingMatrix:
+    def __init__(self):
+        # Readers take this tuple without locking; writers replace it whole.
+        self._snapshot: tuple[np.ndarray, list[int]] = (
+            np.empty((0, EMBEDDING_DIM), dtype=np.float32),
+            [],
+        )
+        self._lock = asyncio.Lock()
+        self._hnsw = None
+        self.loaded = False
+
+    async def load(self, db: AsyncSession) -> int:
+        result = await db.execute(
+            select(Person.id, Person.embedding).where(Person.is_active)
+        )
+        rows = result.all()
+        ids = [row.id for row in rows]
+        matrix = (
+            _unit_rows([row.embedding for row in rows])
+            if rows
+            else np.empty((0, EMBEDDING_DIM), dtype=np.float32)
+        )
+        if simsimd is None:
+            kernels.warmup(EMBEDDING_DIM)
+        matrix = np.ascontiguousarray(matrix)
+        async with self._lock:
+            self._snapshot = (matrix, ids)
+            self._hnsw = _build_hnsw(matrix, ids)
+            self.loaded = True
+        return len(ids)
+
+    async def add(self, person_id: int, embedding: Sequence[float]) -> None:
+        row = _unit_rows(embedding)
+        async with self._lock:
+            matrix, ids = self._snapshot
+            self._snapshot = (np.vstack((matrix, row)), [*ids, person_id])
+            if self._hnsw is None:
+                self._hnsw = _build_hnsw(*self._snapshot)
+                return
+            if self._hnsw.get_current_count() >= self._hnsw.get_max_elements():
+                self._hnsw.resize_index(2 * self._hnsw.get_max_elements())
+            self._hnsw.add_items(row, np.asarray([person_id], dtype=np.int64))
+
+    def nearest(self, embedding: Sequence[float]) -> tuple[int, float] | None:
+        """Return (person_id, cosine distance) of the closest row."""
+        matrix, ids = self._snapshot
+        if not ids:
+            return None
+        query = _unit_rows(embedding)
+        if self._hnsw is not None:
+            labels, distances = self._hnsw.knn_query(query, k=1)
+            return int(labels[0][0]), float(distances[0][0])
+        if simsimd is not None:
+            distances = np.asarray(simsimd.cdist(query, matrix, "cosine"))[0]
+        else:
+            distances = kernels.cosine_distances(query[0], matrix)
+        best = int(np.argmin(distances))
+        return ids[best], float(distances[best])
+
+    def nearest_many(
+        self, embeddings: Sequence[Sequence[float]]
+    ) -> list[tuple[int, float] | None]:
+        """nearest() for several probes in one (k, D) x (D, N) pass."""
+        matrix, ids = self._snapshot
+        if not ids or not len(embeddings):
+            return [None] * len(embeddings)
+        queries = _unit_rows(embeddings)
+        if self._hnsw is not None:
+            labels, distances = self._hnsw.knn_query(queries, k=1)
+            return [
+                (int(label[0]), float(distance[0]))
+                for label, distance in zip(labels, distances)
+            ]
+        if simsimd is not None:
+            distances = np.asarray(simsimd.cdist(queries, matrix, "cosine"))
+        else:
+            distances = 1.0 - queries @ matrix.T
+        best = np.argmin(distances, axis=1)
+        return [
+            (ids[column], float(distances[row, column]))
+            for row, column in enumerate(best)
+        ]
+
+
+async def get_embedding_matrix(request: Request) -> EmbeddingMatrix:
+    # Created and loaded once per worker in lifespan, like the cache client.
+    return request.app.state.embeddings
@@ -1,16 +1,26 @@
 from __future__ import annotations
 
+import codecs
 import os
+import re
 import subprocess
 import sys
 import threading
+import time
 from collections import deque
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
+from itertools import islice
 from pathlib import Path
 from typing import Any
 
 MAX_LOG_LINES = 600
+# The dashboard polls list_scripts; status changes invalidate it at once.
+LIST_CACHE_TTL_SECONDS = 0.5
+READ_CHUNK_BYTES = 65536
+# A line up to its last non-blank character: trailing whitespace is cut
+# and blank lines produce no match.
+_LOG_LINE = re.compile(r"[^\r\n]*\S")
 
 
 @dataclass(frozen=True)
@@ -30,8 +40,23 @@ class ScriptState:
     finished_at: datetime | None = None
     exit_code: int | None = None
     stop_requested: bool = False
-    process: subprocess.Popen[str] | None = None
+    process: subprocess.Popen[bytes] | None = None
     logs: deque[str] = field(default_factory=lambda: deque(maxlen=MAX_LOG_LINES))
+    # Guards `logs` only, so appends from one script's stream thread never
+    # wait on readers of another. Taken after the runner lock, never before.
+    log_lock: threading.Lock = field(default_factory=threading.Lock)
+    # Copies of logs[-1] and len(logs) kept on write, so serializing a
+    # script never touches the deque. Readers may see them one write late.
+    last_log: str = ""
+    log_size: int = 0
+
+    def write_logs(self, lines: list[str], reset: bool = False) -> None:
+        with self.log_lock:
+            if reset:
+                self.logs.clear()
+            self.logs.extend(lines)
+            self.last_log = self.logs[-1] if self.logs else ""
+            self.log_size = len(self.logs)
 
 
 class LocalScriptRunner:
@@ -40,15 +65,39 @@ class LocalScriptRunner:
         self._specs = {spec.script_id: spec for spec in specs}
         self._ordered_ids = [spec.script_id for spec in specs]
         self._states = {spec.script_id: ScriptState() for spec in specs}
-        self._lock = threading.RLock()
+        # Resolved once; start_script only has to check the file is there.
+        self._script_paths = {
+            spec.script_id: str((project_root / spec.script_path).resolve())
+            for spec in specs
+        }
+        self._lock = threading.Lock()
+        # Bumped on every status change; a cached list is only served while
+        # its version is current.
+        self._list_version = 0
+        self._list_cache: tuple[float, int, list[dict[str, Any]]] | None = None
 
     def list_scripts(self) -> list[dict[str, Any]]:
+        now = time.monotonic()
         with self._lock:
-            return [
-                self._serialize_script(self._specs[script_id], self._states[script_id])
+            cache = self._list_cache
+            if (
+                cache is not None
+                and cache[1] == self._list_version
+                and now - cache[0] < LIST_CACHE_TTL_SECONDS
+            ):
+                return cache[2]
+            # Copy out the fields only; the dicts are built after release.
+            version = self._list_version
+            snapshots = [
+                (self._specs[script_id], self._snapshot(self._states[script_id]))
                 for script_id in self._ordered_ids
             ]
 
+        scripts = [self._build_script(spec, *fields) for spec, fields in snapshots]
+        with self._lock:
+            self._list_cache = (now, version, scripts)
+        return scripts
+
     def get_script(self, script_id: str) -> dict[str, Any]:
         with self._lock:
             spec = self._get_spec(script_id)
@@ -57,10 +106,13 @@ class LocalScriptRunner:
 
     def get_logs(self, script_id: str, tail: int = 200) -> list[str]:
         clamped_tail = max(10, min(tail, MAX_LOG_LINES))
-        with self._lock:
-            self._get_spec(script_id)
-            state = self._states[script_id]
-            return list(state.logs)[-clamped_tail:]
+        self._get_spec(script_id)
+        state = self._states[script_id]
+        with state.log_lock:
+            # Walk back from the newest line so only the tail is copied.
+            tail_lines = list(islice(reversed(state.logs), clamped_tail))
+        tail_lines.reverse()
+        return tail_lines
 
     def get_status(self, script_id: str) -> str:
         with self._lock:
@@ -71,23 +123,26 @@ class LocalScriptRunner:
         self, script_id: str, payload: dict[str, Any] | None = None
     ) -> dict[str, Any]:
         payload = payload or {}
+        spec = self._get_spec(script_id)
+
+        # Nothing here depends on the script's state, so the file check and
+        # env copy stay outside the lock.
+        command = self._build_command(spec, payload)
+        env = os.environ.copy()
+        env["PYTHONUNBUFFERED"] = "1"
+        # The reader decodes UTF-8; make the child write it regardless of
+        # the host locale (e.g. cp1252 consoles printing enrolled names).
+        env["PYTHONIOENCODING"] = "utf-8"
+        creation_flags = (
+            getattr(subprocess, "CREATE_NEW_PROCESS_GROUP", 0) if os.name == "nt" else 0
+        )
 
         with self._lock:
-            spec = self._get_spec(script_id)
             state = self._states[script_id]
 
             if state.status in {"running", "stopping"}:
                 raise RuntimeError(f"{script_id} is already running.")
 
-            command = self._build_command(spec, payload)
-            env = os.environ.copy()
-            env["PYTHONUNBUFFERED"] = "1"
-            creation_flags = (
-                getattr(subprocess, "CREATE_NEW_PROCESS_GROUP", 0)
-                if os.name == "nt"
-                else 0
-            )
-
             try:
                 process = subprocess.Popen(
                     command,
@@ -95,23 +150,21 @@ class LocalScriptRunner:
                     stdout=subprocess.PIPE,
                     stderr=subprocess.STDOUT,
                     stdin=subprocess.DEVNULL,
-                    text=True,
-                    bufsize=1,
+                    bufsize=0,
                     env=env,
                     creationflags=creation_flags,
                 )
             except Exception as exc:
                 raise RuntimeError(f"Unable to start {script_id}: {exc}") from exc
 
+            self._list_version += 1
             state.status = "running"
             state.started_at = datetime.now(timezone.utc)
             state.finished_at = None
             state.exit_code = None
             state.stop_requested = False
             state.process = process
-            state.logs.clear()
-            state.logs.append(f"$ {' '.join(command)}")
-            state.logs.append("Process started.")
+            state.write_logs([f"$ {' '.join(command)}", "Process started."], reset=True)
 
             thread = threading.Thread(
                 target=self._stream_output,
@@ -131,9 +184,10 @@ class LocalScriptRunner:
             if state.status not in {"running", "stopping"} or process is None:
                 raise RuntimeError(f"{script_id} is not currently running.")
 
+            self._list_version += 1
             state.stop_requested = True
             state.status = "stopping"
-            state.logs.append("Stopping process...")
+            state.write_logs(["Stopping process..."])
 
         try:
             process.terminate()
@@ -142,22 +196,32 @@ class LocalScriptRunner:
             process.kill()
         finally:
             with self._lock:
-                state.logs.append("Stop signal sent.")
+                state.write_logs(["Stop signal sent."])
                 return self._serialize_script(spec, state)
 
-    def _stream_output(self, script_id: str, process: subprocess.Popen[str]) -> None:
+    def _stream_output(self, script_id: str, process: subprocess.Popen[bytes]) -> None:
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        pending = ""
         try:
             if process.stdout is not None:
-                for line in process.stdout:
-                    message = line.rstrip()
-                    if message:
-                        self._append_log(script_id, message)
+                fd = process.stdout.fileno()
+                # Each read returns everything the child has written so far,
+                # so a burst of output is appended under one lock acquisition.
+                while chunk := os.read(fd, READ_CHUNK_BYTES):
+                    text = pending + decoder.decode(chunk)
+                    end = max(text.rfind("\n"), text.rfind("\r")) + 1
+                    pending = text[end:]
+                    self._append_logs(script_id, _LOG_LINE.findall(text, 0, end))
+                self._append_logs(
+                    script_id, _LOG_LINE.findall(pending + decoder.decode(b"", True))
+                )
         finally:
             if process.stdout is not None:
                 process.stdout.close()
 
             return_code = process.wait()
             with self._lock:
+                self._list_version += 1
                 state = self._states[script_id]
                 state.exit_code = return_code
                 state.finished_at = datetime.now(timezone.utc)
@@ -171,19 +235,18 @@ class LocalScriptRunner:
 
                 state.process = None
                 state.stop_requested = False
-                state.logs.append(f"Process exited with code {return_code}.")
+                state.write_logs([f"Process exited with code {return_code}."])
 
-    def _append_log(self, script_id: str, line: str) -> None:
-        with self._lock:
-            state = self._states[script_id]
-            state.logs.append(line)
+    def _append_logs(self, script_id: str, lines: list[str]) -> None:
+        if lines:
+            self._states[script_id].write_logs(lines)
 
     def _build_command(self, spec: ScriptSpec, payload: dict[str, Any]) -> list[str]:
-        script_path = self.project_root / spec.script_path
-        if not script_path.exists():
+        script_path = self._script_paths[spec.script_id]
+        if not os.path.isfile(script_path):
             raise RuntimeError(f"Script not found: {spec.script_path}")
 
-        command = [sys.executable, str(script_path)]
+        command = [sys.executable, script_path]
 
         if spec.script_id == "register_face":
             name = str(payload.get("name", "")).strip()
@@ -198,19 +261,41 @@ class LocalScriptRunner:
         return command
 
     def _serialize_script(self, spec: ScriptSpec, state: ScriptState) -> dict[str, Any]:
-        last_log = state.logs[-1] if state.logs else ""
+        return self._build_script(spec, *self._snapshot(state))
+
+    @staticmethod
+    def _snapshot(state: ScriptState) -> tuple:
+        return (
+            state.status,
+            state.started_at,
+            state.finished_at,
+            state.exit_code,
+            state.last_log,
+            state.log_size,
+        )
+
+    @staticmethod
+    def _build_script(
+        spec: ScriptSpec,
+        status: str,
+        started_at: datetime | None,
+        finished_at: datetime | None,
+        exit_code: int | None,
+        last_log: str,
+        log_size: int,
+    ) -> dict[str, Any]:
         return {
             "id": spec.script_id,
             "title": spec.title,
             "description": spec.description,
             "category": spec.category,
             "long_running": spec.long_running,
-            "status": state.status,
-            "started_at": self._to_iso(state.started_at),
-            "finished_at": self._to_iso(state.finished_at),
-            "exit_code": state.exit_code,
+            "status": status,
+            "started_at": started_at,
+            "finished_at": finished_at,
+            "exit_code": exit_code,
             "last_log": last_log,
-            "log_size": len(state.logs),
+            "log_size": log_size,
         }
 
     def _get_spec(self, script_id: str) -> ScriptSpec:
@@ -219,12 +304,6 @@ class LocalScriptRunner:
             raise KeyError(script_id)
         return spec
 
-    @staticmethod
-    def _to_iso(value: datetime | None) -> str | None:
-        if value is None:
-            return None
-        return value.isoformat()
-
 
 def default_script_specs() -> list[ScriptSpec]:
     return [
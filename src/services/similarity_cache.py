@@ -0,0 +1,58 @@
+"""LRU of recent identify queries, matched by nearest cached query.
+
+Consecutive frames of the same face give near-identical embeddings. A
+query whose cosine distance to the closest cached query vector is within
+SIMILARITY_CACHE_TAU reuses that query's match without searching. The
+lookup is one matrix-vector product over every cached vector, so a
+probe that drifts slightly between frames still hits.
+"""
+
+from typing import Sequence
+
+import numpy as np
+
+from src.config import settings
+from src.utils.vectors import EMBEDDING_DIM
+
+
+class SimilarityCache:
+    def __init__(self, max_entries: int = 64):
+        self.max_entries = max_entries
+        # Unused slots are zero rows (similarity 0) with last_used 0.
+        self._vectors = np.zeros((max_entries, EMBEDDING_DIM), dtype=np.float32)
+        self._person_ids = np.zeros(max_entries, dtype=np.int64)
+        self._last_used = np.zeros(max_entries, dtype=np.int64)
+        self._clock = 0
+
+    @staticmethod
+    def _prepare(embedding: Sequence[float]) -> np.ndarray:
+        vector = np.asarray(embedding, dtype=np.float32)
+        return vector / (np.linalg.norm(vector) + 1e-12)
+
+    def get(self, embedding: Sequence[float]) -> int | None:
+        similarities = self._vectors @ self._prepare(embedding)
+        slot = int(np.argmax(similarities))
+        if not self._last_used[slot]:
+            return None
+        if 1.0 - float(similarities[slot]) >= settings.SIMILARITY_CACHE_TAU:
+            return None
+        self._clock += 1
+        self._last_used[slot] = self._clock
+        return int(self._person_ids[slot])
+
+    def put(self, embedding: Sequence[float], person_id: int) -> None:
+        # Empty slots have last_used 0, so they fill before anything is evicted.
+        slot = int(np.argmin(self._last_used))
+        self._clock += 1
+        self._vectors[slot] = self._prepare(embedding)
+        self._person_ids[slot] = person_id
+        self._last_used[slot] = self._clock
+
+    def discard(self, person_id: int) -> None:
+        """Forget every cached query that resolved to person_id."""
+        slots = (self._person_ids == person_id) & (self._last_used > 0)
+        self._vectors[slots] = 0.0
+        self._last_used[slots] = 0
+
+
+similarity_cache = SimilarityCache()
@@ -1,18 +1,53 @@
+import atexit
 import logging
+import logging.handlers
+import queue
 import sys
 
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-    handlers=[
-        logging.StreamHandler(sys.stdout),
-        logging.FileHandler("app.log", mode="a", encoding="utf-8"),
-    ],
-)
+from src.config import settings
 
+LOG_FILE = "app.log"
+LOG_MAX_BYTES = 10_000_000
+LOG_BACKUP_COUNT = 3
 
-def get_logger(name: str):
-    return logging.getLogger(name)
+logger = logging.getLogger("face_attendance_app")
+
+
+def _configure() -> None:
+    # The logger object is process-wide, so a second import of this module
+    # (e.g. under another module path) finds it already wired and stops here.
+    if logger.handlers:
+        return
+
+    formatter = logging.Formatter(
+        "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+    )
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(formatter)
+    file_handler = logging.handlers.RotatingFileHandler(
+        LOG_FILE,
+        maxBytes=LOG_MAX_BYTES,
+        backupCount=LOG_BACKUP_COUNT,
+        encoding="utf-8",
+    )
+    file_handler.setFormatter(formatter)
+
+    # Callers only enqueue records; formatting and stdout/file I/O happen on
+    # the listener thread, off the event loop.
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    listener = logging.handlers.QueueListener(
+        log_queue, stream_handler, file_handler, respect_handler_level=True
+    )
+    listener.start()
+    atexit.register(listener.stop)
 
+    logger.setLevel(logging.DEBUG if settings.DEBUG else logging.INFO)
+    logger.addHandler(logging.handlers.QueueHandler(log_queue))
+    logger.propagate = False
 
-logger = get_logger("face_attendance_app")
+
+_configure()
+
+
+def get_logger(name: str):
+    return logger.getChild(name)
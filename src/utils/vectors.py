@@ -0,0 +1,30 @@
+import base64
+import binascii
+from typing import Sequence
+
+import numpy as np
+
+EMBEDDING_DIM = 512
+# Wire dtypes for base64-packed embeddings: little-endian float16 or int8.
+# int8 needs no scale: every match normalises, and cosine ignores scale.
+EMBEDDING_WIRE_DTYPES = {"f16": np.dtype("<f2"), "i8": np.dtype("i1")}
+
+
+def l2_normalize(values: Sequence[float]) -> np.ndarray:
+    """Scale an embedding to unit length so inner product equals cosine."""
+    # Stays a float32 array: pgvector binds arrays directly, so there is
+    # no round trip through 512 Python floats.
+    vector = np.asarray(values, dtype=np.float32)
+    return vector / (np.linalg.norm(vector) + 1e-12)
+
+
+def decode_embedding_b64(value: str, dtype: str = "f16") -> list[float]:
+    """Decode a base64 packed embedding (see EMBEDDING_WIRE_DTYPES)."""
+    wire_dtype = EMBEDDING_WIRE_DTYPES[dtype]
+    try:
+        raw = base64.b64decode(value, validate=True)
+    except binascii.Error as exc:
+        raise ValueError("embedding is not valid base64") from exc
+    if len(raw) != EMBEDDING_DIM * wire_dtype.itemsize:
+        raise ValueError(f"embedding must hold {EMBEDDING_DIM} {dtype} values")
+    return np.frombuffer(raw, dtype=wire_dtype).astype(np.float32).tolist()